@@ -5,28 +5,99 @@ Provides intelligent analysis and insights about meeting data
 """
 
 import os
+import re
 import logging
+import time
+import threading
+from collections import deque
 from typing import Dict, List, Any, Optional
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-from google.adk.agents import Agent
-from google.adk.tools.function_tool import FunctionTool
-from google.adk.runners import InMemoryRunner
-import google.genai
-from database import get_meetings_data, get_summary_stats
+from database import get_meetings_data, get_summary_stats, get_summary_buckets
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long a fetched meetings DataFrame is reused across chat turns (seconds)
+MEETINGS_CACHE_TTL = 60
+
+# Number of most recent messages kept in the agent's conversation history
+MAX_HISTORY_MESSAGES = 50
+
+# Histogram bins for a single-pass bucketization (duration_minutes is an INTEGER
+# column, so (-inf, 29] is "<30 min" and (29, 60] is "30-60 min")
+DURATION_BINS = [-np.inf, 29, 60, np.inf]
+DURATION_LABELS = ['short', 'medium', 'long']
+ATTENDEE_BINS = [-np.inf, 1, 5, 10, np.inf]
+ATTENDEE_LABELS = ['solo', 'small', 'medium', 'large']
+
+# Columns the chat analysis reads; only these are fetched from the database
+ANALYSIS_COLUMNS = ['department', 'duration_minutes', 'attendees_count', 'start', 'is_one_on_one', 'user_email']
+
+# Columns shown in the sample rows of the comprehensive summary
+SAMPLE_COLUMNS = ['start', 'department', 'duration_minutes', 'attendees_count']
+
+def _bucket_counts(series: pd.Series, bins: List[float], labels: List[str]) -> pd.Series:
+    """Count values per right-closed bucket in one pass over the column"""
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    values = values[~np.isnan(values)]
+    # searchsorted(side='left') maps bins[i-1] < v <= bins[i] to i, same as pd.cut
+    bucket_idx = np.searchsorted(bins, values, side='left') - 1
+    counts = np.bincount(bucket_idx, minlength=len(labels))
+    return pd.Series(counts, index=labels)
+
+# Keyword groups for routing a chat message; matched as plain substrings
+_INTENT_RE = re.compile(
+    r'(?P<user>user)|(?P<department>department)|(?P<one_on_one>one[- ]on[- ]one|1:1)'
+    r'|(?P<efficiency>efficiency|improve|optimize)|(?P<pattern>pattern|trend|analyze)'
+    r'|(?P<ranking>most|highest|top)',
+    re.IGNORECASE
+)
+
+def _classify_intent(message: str) -> str:
+    """Scan the message once and return the intent tag used to route the reply"""
+    found = {match.lastgroup for match in _INTENT_RE.finditer(message)}
+    
+    if 'ranking' in found and 'user' in found:
+        return 'user'
+    if 'ranking' in found and 'department' in found:
+        return 'department'
+    for intent in ('one_on_one', 'efficiency', 'pattern'):
+        if intent in found:
+            return intent
+    return 'overview'
+
+def _format_counts(counts: pd.Series) -> str:
+    """Render a counts Series as 'key: count' pairs without building a dict"""
+    return "{" + ", ".join(f"{key}: {count}" for key, count in counts.items()) + "}"
+
+def _summary_aggregates(df: pd.DataFrame):
+    """Return (avg_duration, avg_attendees, one_on_one_count) from a single df.agg call"""
+    agg_spec = {col: 'mean' for col in ('duration_minutes', 'attendees_count') if col in df.columns}
+    stats = df.agg(agg_spec) if agg_spec else pd.Series(dtype=float)
+    
+    # One-on-one analysis (counted straight on the NumPy buffer, no filtered frame)
+    one_on_one_count = 0
+    if 'is_one_on_one' in df.columns:
+        one_on_one_count = np.count_nonzero(df['is_one_on_one'].to_numpy())
+    elif 'attendees_count' in df.columns:
+        one_on_one_count = np.count_nonzero(df['attendees_count'].to_numpy() == 2)
+    
+    return stats.get('duration_minutes', 0), stats.get('attendees_count', 0), one_on_one_count
+
 class CalendarInsightsAgent:
     """AI Agent specialized in calendar and meeting insights analysis"""
     
     def __init__(self):
         """Initialize the AI agent with calendar-specific tools and knowledge"""
         self.agent = None
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=MAX_HISTORY_MESSAGES)
+        self._df_cache = None  # (fetched_at, df)
+        self._sample_repr = None
+        self._df_lock = threading.Lock()
         self._initialize_agent()
     
     def _initialize_agent(self):
@@ -38,7 +109,14 @@ class CalendarInsightsAgent:
             logger.warning("GOOGLE_API_KEY not found in environment variables")
             return
         
+        # Warm the meetings cache in the background so the first chat turn
+        # doesn't pay for the DB fetch on top of loading the ADK
+        threading.Thread(target=self._prefetch_df, daemon=True).start()
+        
         try:
+            # Imported lazily: google.adk is heavy and only needed once a key is configured
+            from google.adk.agents import Agent
+            
             # Create a simple agent with basic tools
             self.agent = Agent(
                 name="calendar_insights_analyst",
@@ -77,6 +155,7 @@ class CalendarInsightsAgent:
     
     def _create_calendar_tool(self):
         """Create a tool for accessing calendar data"""
+        from google.adk.tools.function_tool import FunctionTool
         
         def get_calendar_data(
             start_date: Optional[str] = None,
@@ -145,53 +224,128 @@ class CalendarInsightsAgent:
         
         return FunctionTool(get_calendar_data)
     
-    def _get_comprehensive_meeting_data(self) -> str:
+    def _get_cached_df(self, limit: int = 5000) -> pd.DataFrame:
+        """Return the meetings DataFrame, re-fetching only once the cache TTL expires"""
+        # Serialized so a chat turn waits for an in-flight prefetch instead of re-querying
+        with self._df_lock:
+            now = time.monotonic()
+            if self._df_cache is not None:
+                fetched_at, df = self._df_cache
+                if now - fetched_at < MEETINGS_CACHE_TTL:
+                    return df
+            
+            df = self._load_meetings_df(limit)
+            self._df_cache = (now, df)
+            return df
+    
+    def _prefetch_df(self):
+        """Populate the meetings cache ahead of the first chat turn"""
+        try:
+            self._get_cached_df()
+        except Exception as e:
+            logger.warning(f"Meetings data prefetch failed: {e}")
+    
+    def _load_meetings_df(self, limit: int) -> pd.DataFrame:
+        """Fetch meetings data and prepare it for repeated analysis"""
+        df = get_meetings_data(limit=limit, columns=ANALYSIS_COLUMNS)  # Get more data for better analysis
+        
+        # Derive the hour once here so chat turns only run value_counts on it
+        if 'start' in df.columns and 'hour' not in df.columns:
+            df['hour'] = pd.to_datetime(df['start'], errors='coerce').dt.hour
+        
+        # Small integer columns are downcast so repeated scans touch fewer bytes
+        for col in ('duration_minutes', 'attendees_count', 'hour'):
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+        if 'is_one_on_one' in df.columns:
+            df['is_one_on_one'] = df['is_one_on_one'].fillna(False).astype(bool)
+        
+        # Low-cardinality string columns become categoricals so value_counts
+        # and equality filters work on integer codes instead of Python strings
+        for col in ('department', 'user_email'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        # Format the sample rows once per fetch rather than on every turn
+        sample_df = df[df.columns.intersection(SAMPLE_COLUMNS)].head()
+        self._sample_repr = sample_df.to_string() if len(df) > 0 else 'No data available'
+        
+        return df
+    
+    def invalidate_cache(self):
+        """Drop the cached meetings DataFrame so the next turn re-fetches it"""
+        with self._df_lock:
+            self._df_cache = None
+            self._sample_repr = None
+    
+    def _compute_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Compute the meeting metrics shared by every analysis step, once per turn"""
+        avg_duration, avg_attendees, one_on_one_count = _summary_aggregates(df)
+        metrics = {
+            'total': len(df),
+            'avg_duration': avg_duration,
+            'avg_attendees': avg_attendees,
+            'one_on_one': one_on_one_count,
+            'dept_counts': None,
+            'duration_buckets': None,
+            'hourly_dist': None,
+            'attendee_dist': None,
+            'attendee_buckets': None,
+        }
+        
+        if 'department' in df.columns:
+            metrics['dept_counts'] = df['department'].value_counts(sort=False)
+        
+        if 'duration_minutes' in df.columns:
+            metrics['duration_buckets'] = _bucket_counts(df['duration_minutes'], DURATION_BINS, DURATION_LABELS)
+        
+        if 'hour' in df.columns:
+            metrics['hourly_dist'] = df['hour'].value_counts().sort_index()
+        
+        if 'attendees_count' in df.columns:
+            metrics['attendee_dist'] = df['attendees_count'].value_counts().sort_index()
+            metrics['attendee_buckets'] = _bucket_counts(df['attendees_count'], ATTENDEE_BINS, ATTENDEE_LABELS)
+        
+        return metrics
+    
+    def _get_comprehensive_meeting_data(self, df: pd.DataFrame, metrics: Dict[str, Any]) -> str:
         """Get comprehensive meeting data for AI analysis"""
         try:
-            # Get all meeting data
-            df = get_meetings_data(limit=5000)  # Get more data for better analysis
-            
             if df.empty:
                 return "No meeting data available in the database."
             
             # Calculate comprehensive statistics
-            total_meetings = len(df)
-            avg_duration = df['duration_minutes'].mean() if 'duration_minutes' in df.columns else 0
-            avg_attendees = df['attendees_count'].mean() if 'attendees_count' in df.columns else 0
-            
-            # One-on-one analysis
-            one_on_one_count = 0
-            if 'is_one_on_one' in df.columns:
-                one_on_one_count = df['is_one_on_one'].sum()
-            elif 'attendees_count' in df.columns:
-                one_on_one_count = len(df[df['attendees_count'] == 2])
+            total_meetings = metrics['total']
+            avg_duration = metrics['avg_duration']
+            avg_attendees = metrics['avg_attendees']
+            one_on_one_count = metrics['one_on_one']
             
             # Department analysis
             dept_analysis = ""
-            if 'department' in df.columns:
-                dept_counts = df['department'].value_counts()
-                dept_analysis = f"Department distribution: {dict(dept_counts.head(10))}\n"
+            dept_counts = metrics['dept_counts']
+            if dept_counts is not None:
+                dept_analysis = f"Department distribution: {_format_counts(dept_counts.nlargest(10))}\n"
             
             # Duration analysis
             duration_stats = ""
-            if 'duration_minutes' in df.columns:
-                long_meetings = len(df[df['duration_minutes'] > 60])
-                short_meetings = len(df[df['duration_minutes'] < 30])
-                medium_meetings = len(df[(df['duration_minutes'] >= 30) & (df['duration_minutes'] <= 60)])
+            duration_buckets = metrics['duration_buckets']
+            if duration_buckets is not None:
+                short_meetings = duration_buckets['short']
+                medium_meetings = duration_buckets['medium']
+                long_meetings = duration_buckets['long']
                 duration_stats = f"Duration distribution: Short (<30min): {short_meetings}, Medium (30-60min): {medium_meetings}, Long (>60min): {long_meetings}\n"
             
             # Time analysis
             time_analysis = ""
-            if 'start' in df.columns:
-                df['hour'] = pd.to_datetime(df['start']).dt.hour
-                hourly_dist = df['hour'].value_counts().sort_index()
-                time_analysis = f"Meeting distribution by hour: {dict(hourly_dist)}\n"
+            hourly_dist = metrics['hourly_dist']
+            if hourly_dist is not None:
+                time_analysis = f"Meeting distribution by hour: {_format_counts(hourly_dist)}\n"
             
             # Attendee analysis
             attendee_analysis = ""
-            if 'attendees_count' in df.columns:
-                attendee_dist = df['attendees_count'].value_counts().sort_index()
-                attendee_analysis = f"Meeting size distribution: {dict(attendee_dist)}\n"
+            attendee_dist = metrics['attendee_dist']
+            if attendee_dist is not None:
+                attendee_analysis = f"Meeting size distribution: {_format_counts(attendee_dist)}\n"
             
             # Create comprehensive data summary
             data_summary = f"""
@@ -209,7 +363,7 @@ Basic Statistics:
 {attendee_analysis}
 
 Sample of recent meetings (first 5):
-{df.head().to_string() if len(df) > 0 else 'No data available'}
+{self._sample_repr}
 
 Data columns available: {list(df.columns)}
             """
@@ -237,12 +391,17 @@ Data columns available: {list(df.columns)}
             # Add user message to conversation history
             self.conversation_history.append({"role": "user", "content": user_message})
             
+            # Fetch meeting data once per turn and share it with both analysis steps
+            df = self._get_cached_df()
+            
+            metrics = self._compute_metrics(df)
+            
             # Get comprehensive meeting data for analysis
-            meeting_data = self._get_comprehensive_meeting_data()
+            meeting_data = self._get_comprehensive_meeting_data(df, metrics)
             
             # For now, let's use the enhanced data analysis directly
             # This gives us more control and better data access
-            response = self._provide_enhanced_data_analysis(user_message, meeting_data)
+            response = self._provide_enhanced_data_analysis(user_message, meeting_data, df, metrics)
             
             # Add response to conversation history
             self.conversation_history.append({"role": "assistant", "content": response})
@@ -252,42 +411,35 @@ Data columns available: {list(df.columns)}
             logger.error(f"Error in chat: {e}")
             return f"I apologize, but I encountered an error: {str(e)}. Please try again."
 
-    def _provide_enhanced_data_analysis(self, user_message: str, meeting_data: str) -> str:
+    def _provide_enhanced_data_analysis(self, user_message: str, meeting_data: str, df: pd.DataFrame, metrics: Dict[str, Any]) -> str:
         """Provide enhanced data analysis with deep insights"""
         try:
-            # Get the actual data directly for more detailed analysis
-            df = get_meetings_data(limit=5000)
-            
             if df.empty:
                 return "I don't have access to meeting data at the moment. Please ensure the database is properly configured and contains meeting data."
             
             # Calculate comprehensive metrics
-            total_meetings = len(df)
-            avg_duration = df['duration_minutes'].mean() if 'duration_minutes' in df.columns else 0
-            avg_attendees = df['attendees_count'].mean() if 'attendees_count' in df.columns else 0
-            
-            # One-on-one analysis
-            one_on_one_count = 0
-            if 'is_one_on_one' in df.columns:
-                one_on_one_count = df['is_one_on_one'].sum()
-            elif 'attendees_count' in df.columns:
-                one_on_one_count = len(df[df['attendees_count'] == 2])
+            total_meetings = metrics['total']
+            avg_duration = metrics['avg_duration']
+            avg_attendees = metrics['avg_attendees']
+            one_on_one_count = metrics['one_on_one']
             
             # Department analysis
             dept_analysis = ""
-            if 'department' in df.columns:
-                dept_counts = df['department'].value_counts()
-                dept_analysis = f"**Department Distribution:**\n"
-                for dept, count in dept_counts.head(5).items():
-                    percentage = (count / total_meetings) * 100
-                    dept_analysis += f"- {dept}: {count} meetings ({percentage:.1f}%)\n"
+            dept_counts = metrics['dept_counts']
+            if dept_counts is not None:
+                dept_analysis = "**Department Distribution:**\n" + "".join(
+                    f"- {dept}: {count} meetings ({(count / total_meetings) * 100:.1f}%)\n"
+                    for dept, count in dept_counts.nlargest(5).items()
+                )
             
             # Duration analysis
             duration_analysis = ""
-            if 'duration_minutes' in df.columns:
-                long_meetings = len(df[df['duration_minutes'] > 60])
-                short_meetings = len(df[df['duration_minutes'] < 30])
-                medium_meetings = len(df[(df['duration_minutes'] >= 30) & (df['duration_minutes'] <= 60)])
+            long_meetings = 0
+            duration_buckets = metrics['duration_buckets']
+            if duration_buckets is not None:
+                short_meetings = duration_buckets['short']
+                medium_meetings = duration_buckets['medium']
+                long_meetings = duration_buckets['long']
                 duration_analysis = f"""**Duration Distribution:**
 - Short meetings (<30min): {short_meetings} ({(short_meetings/total_meetings*100):.1f}%)
 - Medium meetings (30-60min): {medium_meetings} ({(medium_meetings/total_meetings*100):.1f}%)
@@ -295,35 +447,36 @@ Data columns available: {list(df.columns)}
             
             # Time analysis
             time_analysis = ""
-            if 'start' in df.columns:
-                df['hour'] = pd.to_datetime(df['start']).dt.hour
-                hourly_dist = df['hour'].value_counts().sort_index()
+            peak_hour = 9  # default
+            hourly_dist = metrics['hourly_dist']
+            if hourly_dist is not None:
                 peak_hour = hourly_dist.idxmax()
                 peak_count = hourly_dist.max()
                 time_analysis = f"""**Time Patterns:**
 - Peak meeting hour: {peak_hour}:00 ({peak_count} meetings)
-- Meeting distribution: Most active between {hourly_dist.head(3).index.tolist()}\n"""
+- Meeting distribution: Most active between {hourly_dist.nlargest(3).index.tolist()}\n"""
             
             # Attendee analysis
             attendee_analysis = ""
-            if 'attendees_count' in df.columns:
-                attendee_dist = df['attendees_count'].value_counts().sort_index()
+            attendee_dist = metrics['attendee_dist']
+            if attendee_dist is not None:
                 most_common_size = attendee_dist.idxmax()
+                attendee_buckets = metrics['attendee_buckets']
                 attendee_analysis = f"""**Meeting Size Patterns:**
 - Most common meeting size: {most_common_size} attendees
-- Large meetings (>10 people): {len(df[df['attendees_count'] > 10])} meetings
-- Small meetings (2-5 people): {len(df[(df['attendees_count'] >= 2) & (df['attendees_count'] <= 5)])} meetings\n"""
+- Large meetings (>10 people): {attendee_buckets['large']} meetings
+- Small meetings (2-5 people): {attendee_buckets['small']} meetings\n"""
             
-            user_msg_lower = user_message.lower()
+            intent = _classify_intent(user_message)
             
             # Provide intelligent analysis based on the question
-            if "user" in user_msg_lower and ("most" in user_msg_lower or "highest" in user_msg_lower or "top" in user_msg_lower):
+            if intent == 'user':
                 return self._analyze_user_meetings(df, user_message)
             
-            elif "department" in user_msg_lower and ("most" in user_msg_lower or "highest" in user_msg_lower or "top" in user_msg_lower):
+            elif intent == 'department':
                 return self._analyze_department_meetings(df, user_message)
             
-            elif "one on one" in user_msg_lower or "1:1" in user_msg_lower or "one-on-one" in user_msg_lower:
+            elif intent == 'one_on_one':
                 one_on_one_percentage = (one_on_one_count / total_meetings) * 100
                 return f"""📊 **One-on-One Meeting Deep Analysis:**
 
@@ -349,7 +502,7 @@ Data columns available: {list(df.columns)}
 **Next Steps:**
 Would you like me to analyze department-specific 1:1 patterns or meeting efficiency metrics?"""
             
-            elif "efficiency" in user_msg_lower or "improve" in user_msg_lower or "optimize" in user_msg_lower:
+            elif intent == 'efficiency':
                 efficiency_score = 100
                 if avg_duration > 60:
                     efficiency_score -= 20
@@ -397,25 +550,16 @@ Would you like me to analyze department-specific 1:1 patterns or meeting efficie
 
 What specific efficiency metric would you like me to dive deeper into?"""
             
-            elif "pattern" in user_msg_lower or "trend" in user_msg_lower or "analyze" in user_msg_lower:
+            elif intent == 'pattern':
                 # Calculate efficiency score for pattern analysis
                 efficiency_score = 100
                 if avg_duration > 60:
                     efficiency_score -= 20
-                if 'duration_minutes' in df.columns:
-                    long_meetings = len(df[df['duration_minutes'] > 60])
-                    if long_meetings / total_meetings > 0.3:
-                        efficiency_score -= 15
+                if long_meetings / total_meetings > 0.3:
+                    efficiency_score -= 15
                 if avg_attendees > 8:
                     efficiency_score -= 10
                 
-                # Get peak hour for time analysis
-                peak_hour = 9  # default
-                if 'start' in df.columns:
-                    df['hour'] = pd.to_datetime(df['start']).dt.hour
-                    hourly_dist = df['hour'].value_counts().sort_index()
-                    peak_hour = hourly_dist.idxmax()
-                
                 return f"""📊 **Comprehensive Meeting Pattern Analysis:**
 
 **Overview:**
@@ -501,20 +645,22 @@ Would you like me to analyze specific department patterns, time-based trends, or
         try:
             # Check if we have user data in the meetings
             if 'user_email' in df.columns:
-                user_meetings = df['user_email'].value_counts()
-                top_user = user_meetings.index[0]
-                top_count = user_meetings.iloc[0]
-                
-                # Get top 5 users
-                top_5_users = user_meetings.head(5)
+                # Per-user count and averages in one groupby, then the top 5 by count
+                user_aggs = {'count': ('user_email', 'size')}
+                if 'duration_minutes' in df.columns:
+                    user_aggs['avg_duration'] = ('duration_minutes', 'mean')
+                if 'attendees_count' in df.columns:
+                    user_aggs['avg_attendees'] = ('attendees_count', 'mean')
+                per_user = df.groupby('user_email', observed=True).agg(**user_aggs).nlargest(5, 'count')
                 
-                # Calculate user-specific metrics
-                user_df = df[df['user_email'] == top_user]
-                user_avg_duration = user_df['duration_minutes'].mean() if 'duration_minutes' in user_df.columns else 0
-                user_avg_attendees = user_df['attendees_count'].mean() if 'attendees_count' in user_df.columns else 0
+                top_5_users = per_user['count']
+                top_user = per_user.index[0]
+                top_count = top_5_users.iloc[0]
+                user_avg_duration = per_user['avg_duration'].iloc[0] if 'avg_duration' in per_user.columns else 0
+                user_avg_attendees = per_user['avg_attendees'].iloc[0] if 'avg_attendees' in per_user.columns else 0
                 
                 # Build the response step by step
-                result = f"""👤 **User Meeting Analysis:**
+                parts = [f"""👤 **User Meeting Analysis:**
 
 **Top User by Meeting Count:**
 - **{top_user}**: {top_count} meetings
@@ -522,13 +668,14 @@ Would you like me to analyze specific department patterns, time-based trends, or
 - **Average attendees**: {user_avg_attendees:.1f}
 
 **Top 5 Most Active Users:**
-"""
+"""]
                 
-                for i, (user, count) in enumerate(top_5_users.items(), 1):
-                    percentage = (count / len(df)) * 100
-                    result += f"\n{i}. **{user}**: {count} meetings ({percentage:.1f}%)"
+                parts.extend(
+                    f"\n{i}. **{user}**: {count} meetings ({(count / len(df)) * 100:.1f}%)"
+                    for i, (user, count) in enumerate(top_5_users.items(), 1)
+                )
                 
-                result += f"""
+                parts.append(f"""
 
 **Insights:**
 - {top_user} is the most active meeting organizer with {top_count} meetings
@@ -540,9 +687,9 @@ Would you like me to analyze specific department patterns, time-based trends, or
 - Review meeting necessity and efficiency for top organizers
 - Balance meeting load across team members
 
-Would you like me to analyze specific user patterns or department distribution?"""
+Would you like me to analyze specific user patterns or department distribution?""")
                 
-                return result
+                return "".join(parts)
             
             elif 'attendees' in df.columns:
                 # If we don't have organizer data, analyze by attendees
@@ -577,20 +724,34 @@ Would you like me to analyze department patterns or meeting efficiency instead?"
     def _analyze_department_meetings(self, df, user_message: str) -> str:
         """Analyze department-specific meeting patterns"""
         try:
-            if 'department' in df.columns:
-                dept_meetings = df['department'].value_counts()
+            # Per-department aggregates come straight from the database
+            dept_stats = get_summary_buckets()
+            
+            if not dept_stats.empty:
+                dept_meetings = dept_stats.set_index('department')['meetings']
+                total_meetings = dept_meetings.sum()
+                top_dept = dept_meetings.index[0]
+                top_count = dept_meetings.iloc[0]
+                dept_avg_duration = dept_stats['avg_duration'].iloc[0]
+                dept_avg_attendees = dept_stats['avg_attendees'].iloc[0]
+            elif 'department' in df.columns:
+                dept_meetings = df['department'].value_counts(sort=False).nlargest(5)
+                total_meetings = len(df)
                 top_dept = dept_meetings.index[0]
                 top_count = dept_meetings.iloc[0]
-                
-                # Get top 5 departments
-                top_5_depts = dept_meetings.head(5)
                 
                 # Calculate department-specific metrics
-                dept_df = df[df['department'] == top_dept]
+                dept_codes = df['department'].cat.codes
+                dept_df = df[dept_codes == df['department'].cat.categories.get_loc(top_dept)]
                 dept_avg_duration = dept_df['duration_minutes'].mean() if 'duration_minutes' in dept_df.columns else 0
                 dept_avg_attendees = dept_df['attendees_count'].mean() if 'attendees_count' in dept_df.columns else 0
-                
-                result = f"""🏢 **Department Meeting Analysis:**
+            else:
+                return "I don't have department information available in the current dataset. Would you like me to analyze other aspects of your meeting data?"
+            
+            # Get top 5 departments
+            top_5_depts = dept_meetings.head(5)
+            
+            parts = [f"""🏢 **Department Meeting Analysis:**
 
 **Most Active Department:**
 - **{top_dept}**: {top_count} meetings
@@ -598,12 +759,13 @@ Would you like me to analyze department patterns or meeting efficiency instead?"
 - **Average attendees**: {dept_avg_attendees:.1f}
 
 **Top 5 Most Active Departments:**
-"""
-                for i, (dept, count) in enumerate(top_5_depts.items(), 1):
-                    percentage = (count / len(df)) * 100
-                    result += f"\n{i}. **{dept}**: {count} meetings ({percentage:.1f}%)"
-                
-                result += f"""
+"""]
+            parts.extend(
+                f"\n{i}. **{dept}**: {count} meetings ({(count / total_meetings) * 100:.1f}%)"
+                for i, (dept, count) in enumerate(top_5_depts.items(), 1)
+            )
+            
+            parts.append(f"""
 
 **Insights:**
 - {top_dept} is the most meeting-intensive department with {top_count} meetings
@@ -615,19 +777,17 @@ Would you like me to analyze department patterns or meeting efficiency instead?"
 - Consider cross-department collaboration opportunities
 - Balance meeting load across departments
 
-Would you like me to analyze specific department patterns or user distribution?"""
-                
-                return result
-            else:
-                return "I don't have department information available in the current dataset. Would you like me to analyze other aspects of your meeting data?"
-                
+Would you like me to analyze specific department patterns or user distribution?""")
+            
+            return "".join(parts)
+            
         except Exception as e:
             logger.error(f"Error analyzing department meetings: {e}")
             return f"I encountered an error analyzing department meeting data: {str(e)}. Please try rephrasing your question."
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get the conversation history"""
-        return self.conversation_history
+        return list(self.conversation_history)
     
     def is_initialized(self) -> bool:
         """Check if the agent is properly initialized"""
@@ -646,4 +806,6 @@ def get_agent() -> CalendarInsightsAgent:
 def reset_agent():
     """Reset the global agent instance"""
     global _agent_instance
+    if _agent_instance is not None:
+        _agent_instance.invalidate_cache()
     _agent_instance = None
\ No newline at end of file
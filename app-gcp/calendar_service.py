@@ -7,14 +7,35 @@ This version uses OAuth2 flow instead of service account credentials.
 import os
 import json
 import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any
 
+import google_auth_httplib2
+import httplib2
+import requests
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    # Python 3.11+ fromisoformat accepts the 'Z' suffix directly
+    _parse_datetime = datetime.fromisoformat
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +46,145 @@ CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 CREDENTIALS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'credentials/service-account.json')
 TOKEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'credentials/token.json')
 
+# Socket timeout (seconds) for Calendar API requests
+HTTP_TIMEOUT = 30
+
+# Bytes of Calendar API responses kept in memory for ETag revalidation (never written to disk: they hold attendee PII)
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Partial-response mask covering every event field read by _process_event and its callers
+_EVENT_FIELDS_MASK = (
+    'items(id,summary,description,start,end,organizer/email,attendees(email,responseStatus),'
+    'hangoutLink,htmlLink,location,created,updated,status,conferenceData/entryPoints(entryPointType,uri)),'
+    'nextPageToken,nextSyncToken'
+)
+
+# Calendar API limits
+MAX_EVENTS_PER_PAGE = 2500
+MAX_BATCH_REQUESTS = 50  # sub-requests allowed in one batch HTTP request
+
+# Worker threads for per-calendar parallel fetches
+MAX_FETCH_WORKERS = 8
+
+# Upper bound (seconds) on reusing an authenticated service; also capped by token expiry
+SERVICE_CACHE_TTL = 300
+# How long (seconds) list_calendars results are reused
+CALENDAR_LIST_CACHE_TTL = 300
+
+# Process-wide caches shared by all GoogleCalendarService instances:
+# (token file, mtime) -> (credentials, service, expires_at) and token file -> (expires_at, calendars)
+_SERVICE_CACHE: Dict[tuple, tuple] = {}
+_CALENDAR_LIST_CACHE: Dict[str, tuple] = {}
+_CACHE_LOCK = threading.Lock()
+
+class _MemoryHttpCache:
+    """Thread-safe, size-bounded in-memory httplib2 cache; least recently used responses are evicted first"""
+    
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._discard(key)
+            if len(value) > self._max_bytes:
+                return
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+    
+    def delete(self, key):
+        with self._lock:
+            self._discard(key)
+    
+    def _discard(self, key):
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self._size -= len(value)
+
+# Shared transports so token refreshes and API calls reuse open TLS connections
+_REFRESH_REQUEST = Request(session=requests.Session())
+_HTTP_CACHE = _MemoryHttpCache(HTTP_CACHE_MAX_BYTES)
+_HTTP = None
+
+def _shared_http():
+    """Return the process-wide httplib2 client, creating it on first use"""
+    global _HTTP
+    with _CACHE_LOCK:
+        if _HTTP is None:
+            _HTTP = httplib2.Http(cache=_HTTP_CACHE, timeout=HTTP_TIMEOUT)
+        return _HTTP
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that decodes API responses with orjson"""
+    
+    def deserialize(self, content):
+        body = orjson.loads(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+def _token_cache_key():
+    """Cache key for the current token file, or None if it does not exist"""
+    if not os.path.exists(TOKEN_FILE):
+        return None
+    return (TOKEN_FILE, os.path.getmtime(TOKEN_FILE))
+
+class _EventView:
+    """Slotted holder for the event fields used downstream; iterating yields (field, value) pairs"""
+    __slots__ = ('id', 'summary', 'description', 'start', 'end', 'organizer', 'attendees',
+                 'hangout_link', 'html_link', 'location', 'created', 'updated', 'status', 'conference_data')
+    
+    def __iter__(self):
+        return ((name, getattr(self, name)) for name in self.__slots__)
+
+@dataclass(slots=True)
+class MeetingRecord:
+    """One calendar event in the meetings table format"""
+    event_id: str
+    calendar_id: str
+    organizer_email: str
+    user_email: str
+    summary: str
+    start_time: datetime
+    end_time: datetime
+    duration_minutes: int
+    attendees_count: int
+    attendees_accepted: int
+    attendees_declined: int
+    attendees_tentative: int
+    attendees_needs_action: int
+    attendees_accepted_emails: List[str] = field(default_factory=list)
+    meet_link: str = ''
+    html_link: str = ''
+    is_one_on_one: bool = False
+    has_manager_attendee: bool = False  # Would need additional logic to determine
+    unique_departments: int = 1
+    departments_list: str = 'Unknown'  # Would need user mapping
+    department: str = 'Unknown'
+    division: str = 'Unknown'
+    subdepartment: str = 'Unknown'
+    is_manager: bool = False
+
+def _to_rfc3339(value) -> str:
+    """Format a datetime for timeMin/timeMax; naive datetimes are treated as UTC"""
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is None:
+        return value.isoformat() + 'Z'
+    return value.isoformat()
+
 class GoogleCalendarService:
     """Production Google Calendar service using OAuth2"""
     
@@ -36,6 +196,16 @@ class GoogleCalendarService:
     def authenticate(self) -> bool:
         """Authenticate with Google Calendar API using OAuth2"""
         try:
+            # Reuse a service built from the same token file while its access token is still valid
+            cache_key = _token_cache_key()
+            with _CACHE_LOCK:
+                cached = _SERVICE_CACHE.get(cache_key)
+            if cached and cached[2] > time.monotonic() and cached[0].valid:
+                self.credentials, self.service, _ = cached
+                self._authenticated = True
+                logger.info("Reusing cached Google Calendar service")
+                return True
+            
             logger.info("Authenticating with Google Calendar API using OAuth2...")
             
             # Load existing token if available
@@ -48,7 +218,7 @@ class GoogleCalendarService:
                 if self.credentials and self.credentials.expired and self.credentials.refresh_token:
                     logger.info("Refreshing expired token...")
                     try:
-                        self.credentials.refresh(Request())
+                        self.credentials.refresh(_REFRESH_REQUEST)
                         logger.info("Token refreshed successfully")
                         
                         # Save refreshed token
@@ -64,9 +234,16 @@ class GoogleCalendarService:
                     logger.info("Please run OAuth2 flow to get new credentials")
                     return False
             
-            # Build the service
-            self.service = build('calendar', 'v3', credentials=self.credentials)
+            # Build the service on the shared httplib2 client; its response cache lets unchanged
+            # pages be revalidated with ETags instead of re-downloaded
+            authed_http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=_shared_http())
+            # static_discovery uses the discovery document bundled with googleapiclient
+            self.service = build(
+                'calendar', 'v3', http=authed_http, cache_discovery=False, static_discovery=True,
+                model=_OrjsonModel() if ORJSON_AVAILABLE else None
+            )
             self._authenticated = True
+            self._cache_service()
             logger.info("Google Calendar service authenticated successfully with OAuth2")
             return True
             
@@ -74,16 +251,43 @@ class GoogleCalendarService:
             logger.error(f"OAuth2 authentication failed: {e}")
             return False
     
+    def _cache_service(self):
+        """Store the authenticated credentials/service pair for reuse by other instances"""
+        cache_key = _token_cache_key()
+        if cache_key is None:
+            return
+        
+        ttl = SERVICE_CACHE_TTL
+        if self.credentials.expiry:
+            # google-auth keeps expiry as a naive UTC datetime
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            ttl = min(ttl, (self.credentials.expiry - now).total_seconds())
+        if ttl <= 0:
+            return
+        
+        with _CACHE_LOCK:
+            # Drop entries for older versions of the token file
+            for key in [key for key in _SERVICE_CACHE if key[0] == TOKEN_FILE]:
+                del _SERVICE_CACHE[key]
+            _SERVICE_CACHE[cache_key] = (self.credentials, self.service, time.monotonic() + ttl)
+    
     def list_calendars(self) -> List[Dict[str, Any]]:
         """List all accessible calendars"""
         if not self._authenticated:
             if not self.authenticate():
                 return []
         
+        with _CACHE_LOCK:
+            cached = _CALENDAR_LIST_CACHE.get(TOKEN_FILE)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
         try:
             calendar_list = self.service.calendarList().list().execute()
             calendars = calendar_list.get('items', [])
             logger.info(f"Found {len(calendars)} calendars")
+            with _CACHE_LOCK:
+                _CALENDAR_LIST_CACHE[TOKEN_FILE] = (time.monotonic() + CALENDAR_LIST_CACHE_TTL, calendars)
             return calendars
         except HttpError as e:
             logger.error(f"Error listing calendars: {e}")
@@ -92,34 +296,51 @@ class GoogleCalendarService:
             logger.error(f"Unexpected error listing calendars: {e}")
             return []
     
+    @staticmethod
+    def _format_time_range(start_date: Optional[datetime], end_date: Optional[datetime]):
+        """Return (timeMin, timeMax) strings for the API, defaulting to the last 30 days"""
+        # Default to last 30 days if no dates provided
+        if not end_date:
+            end_date = datetime.now(timezone.utc)
+        if not start_date:
+            start_date = end_date - timedelta(days=30)
+        
+        return _to_rfc3339(start_date), _to_rfc3339(end_date)
+    
+    @staticmethod
+    def _process_event(event: Dict[str, Any]) -> _EventView:
+        """Extract the fields used downstream from a raw API event"""
+        view = _EventView.__new__(_EventView)
+        view.id = event.get('id')
+        view.summary = event.get('summary', 'No Title')
+        view.description = event.get('description', '')
+        view.start = event.get('start', {})
+        view.end = event.get('end', {})
+        view.organizer = event.get('organizer', {})
+        view.attendees = event.get('attendees', [])
+        view.hangout_link = event.get('hangoutLink')
+        view.html_link = event.get('htmlLink')
+        view.location = event.get('location', '')
+        view.created = event.get('created')
+        view.updated = event.get('updated')
+        view.status = event.get('status')
+        view.conference_data = event.get('conferenceData', {})
+        return view
+    
     def get_events(self, 
                    calendar_id: str = 'primary',
                    start_date: Optional[datetime] = None,
                    end_date: Optional[datetime] = None,
-                   max_results: int = 100) -> List[Dict[str, Any]]:
+                   max_results: int = 100) -> List[_EventView]:
         """Get calendar events for specified date range"""
         if not self._authenticated:
             if not self.authenticate():
                 return []
         
         try:
-            # Default to last 30 days if no dates provided
-            if not end_date:
-                end_date = datetime.now(timezone.utc)
-            if not start_date:
-                start_date = end_date - timedelta(days=30)
+            time_min, time_max = self._format_time_range(start_date, end_date)
             
-            logger.info(f"Fetching events from {calendar_id} between {start_date} and {end_date}")
-            
-            # Ensure dates are properly formatted for the API
-            time_min = start_date.isoformat() if hasattr(start_date, 'isoformat') else start_date
-            time_max = end_date.isoformat() if hasattr(end_date, 'isoformat') else end_date
-            
-            # Add 'Z' suffix if timezone info is missing
-            if not time_min.endswith('Z') and '+' not in time_min and time_min.count(':') == 2:
-                time_min += 'Z'
-            if not time_max.endswith('Z') and '+' not in time_max and time_max.count(':') == 2:
-                time_max += 'Z'
+            logger.info(f"Fetching events from {calendar_id} between {time_min} and {time_max}")
             
             events_result = self.service.events().list(
                 calendarId=calendar_id,
@@ -127,34 +348,15 @@ class GoogleCalendarService:
                 timeMax=time_max,
                 maxResults=max_results,
                 singleEvents=True,
-                orderBy='startTime'
+                orderBy='startTime',
+                fields=_EVENT_FIELDS_MASK
             ).execute()
             
             events = events_result.get('items', [])
             logger.info(f"Found {len(events)} events")
             
             # Process events to extract useful information
-            processed_events = []
-            for event in events:
-                processed_event = {
-                    'id': event.get('id'),
-                    'summary': event.get('summary', 'No Title'),
-                    'description': event.get('description', ''),
-                    'start': event.get('start', {}),
-                    'end': event.get('end', {}),
-                    'organizer': event.get('organizer', {}),
-                    'attendees': event.get('attendees', []),
-                    'hangout_link': event.get('hangoutLink'),
-                    'html_link': event.get('htmlLink'),
-                    'location': event.get('location', ''),
-                    'created': event.get('created'),
-                    'updated': event.get('updated'),
-                    'status': event.get('status'),
-                    'conference_data': event.get('conferenceData', {})
-                }
-                processed_events.append(processed_event)
-            
-            return processed_events
+            return [self._process_event(event) for event in events]
             
         except HttpError as e:
             logger.error(f"Error fetching events: {e}")
@@ -163,20 +365,180 @@ class GoogleCalendarService:
             logger.error(f"Unexpected error fetching events: {e}")
             return []
     
+    def get_events_batched(self,
+                           calendar_ids: List[str],
+                           start_date: Optional[datetime] = None,
+                           end_date: Optional[datetime] = None) -> Dict[str, List[_EventView]]:
+        """Get events for several calendars using batch HTTP requests
+        
+        Every calendar's first page goes out in one multipart request; follow-up
+        pages for calendars that returned a nextPageToken are batched the same way
+        until all calendars are exhausted.
+        """
+        if not self._authenticated:
+            if not self.authenticate():
+                return {}
+        
+        try:
+            time_min, time_max = self._format_time_range(start_date, end_date)
+            results = {calendar_id: [] for calendar_id in calendar_ids}
+            pending = {calendar_id: None for calendar_id in calendar_ids}  # calendar_id -> page token
+            
+            while pending:
+                next_pending = {}
+                
+                def _collect(request_id, response, exception):
+                    if exception is not None:
+                        logger.error(f"Error fetching events from {request_id}: {exception}")
+                        return
+                    results[request_id].extend(self._process_event(event) for event in response.get('items', []))
+                    page_token = response.get('nextPageToken')
+                    if page_token:
+                        next_pending[request_id] = page_token
+                
+                calendar_batch = list(pending)
+                for offset in range(0, len(calendar_batch), MAX_BATCH_REQUESTS):
+                    batch = self.service.new_batch_http_request(callback=_collect)
+                    for calendar_id in calendar_batch[offset:offset + MAX_BATCH_REQUESTS]:
+                        batch.add(
+                            self.service.events().list(
+                                calendarId=calendar_id,
+                                timeMin=time_min,
+                                timeMax=time_max,
+                                maxResults=MAX_EVENTS_PER_PAGE,
+                                singleEvents=True,
+                                orderBy='startTime',
+                                pageToken=pending[calendar_id],
+                                fields=_EVENT_FIELDS_MASK
+                            ),
+                            request_id=calendar_id
+                        )
+                    batch.execute()
+                
+                pending = next_pending
+            
+            logger.info(f"Found {sum(len(events) for events in results.values())} events across {len(calendar_ids)} calendars")
+            return results
+            
+        except HttpError as e:
+            logger.error(f"Error fetching batched events: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unexpected error fetching batched events: {e}")
+            return {}
+    
+    def _get_calendar_events(self, calendar_id: str, time_min: str, time_max: str) -> List[_EventView]:
+        """Fetch every page of one calendar on a dedicated HTTP client (httplib2 is not thread-safe)"""
+        http = google_auth_httplib2.AuthorizedHttp(
+            self.credentials, http=httplib2.Http(cache=_HTTP_CACHE, timeout=HTTP_TIMEOUT)
+        )
+        events = []
+        page_token = None
+        while True:
+            response = self.service.events().list(
+                calendarId=calendar_id,
+                timeMin=time_min,
+                timeMax=time_max,
+                maxResults=MAX_EVENTS_PER_PAGE,
+                singleEvents=True,
+                orderBy='startTime',
+                pageToken=page_token,
+                fields=_EVENT_FIELDS_MASK
+            ).execute(http=http)
+            events.extend(self._process_event(event) for event in response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return events
+    
+    def get_events_many(self,
+                        calendar_ids: List[str],
+                        start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None) -> Dict[str, List[_EventView]]:
+        """Get events for several calendars in parallel worker threads"""
+        if not self._authenticated:
+            if not self.authenticate():
+                return {}
+        
+        time_min, time_max = self._format_time_range(start_date, end_date)
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            futures = {
+                executor.submit(self._get_calendar_events, calendar_id, time_min, time_max): calendar_id
+                for calendar_id in calendar_ids
+            }
+            for future in as_completed(futures):
+                calendar_id = futures[future]
+                try:
+                    results[calendar_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching events from {calendar_id}: {e}")
+                    results[calendar_id] = []
+        
+        logger.info(f"Found {sum(len(events) for events in results.values())} events across {len(calendar_ids)} calendars")
+        return results
+    
+    def get_events_incremental(self,
+                               calendar_id: str = 'primary',
+                               sync_token: Optional[str] = None,
+                               start_date: Optional[datetime] = None):
+        """Get events changed since sync_token, or run a full sync from start_date without one
+        
+        Returns (events, next_sync_token). Deleted events come back with status
+        'cancelled' so callers can remove them. An expired token (410 Gone)
+        falls back to a full sync, which starts a new sync chain.
+        """
+        if not self._authenticated:
+            if not self.authenticate():
+                return [], None
+        
+        params = {
+            'calendarId': calendar_id,
+            'singleEvents': True,
+            'maxResults': MAX_EVENTS_PER_PAGE,
+            'fields': _EVENT_FIELDS_MASK
+        }
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            # timeMin is only allowed on the initial request of a sync chain
+            params['timeMin'], _ = self._format_time_range(start_date, None)
+        
+        try:
+            events = []
+            page_token = None
+            while True:
+                response = self.service.events().list(pageToken=page_token, **params).execute()
+                events.extend(self._process_event(event) for event in response.get('items', []))
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+            
+            logger.info(f"Found {len(events)} changed events in {calendar_id}")
+            return events, response.get('nextSyncToken')
+            
+        except HttpError as e:
+            if sync_token and e.resp.status == 410:
+                logger.info(f"Sync token for {calendar_id} expired, running a full sync")
+                return self.get_events_incremental(calendar_id, start_date=start_date)
+            logger.error(f"Error syncing events: {e}")
+            return [], None
+        except Exception as e:
+            logger.error(f"Unexpected error syncing events: {e}")
+            return [], None
+    
     def get_meeting_data(self, days_back: int = 7) -> List[Dict[str, Any]]:
         """Get meeting data with enhanced processing for analytics"""
-        events = self.get_events(
-            start_date=datetime.now(timezone.utc) - timedelta(days=days_back),
-            end_date=datetime.now(timezone.utc)
-        )
+        now = datetime.now(timezone.utc)
+        events = self.get_events(start_date=now - timedelta(days=days_back), end_date=now)
         
         meeting_data = []
         for event in events:
-            attendees = event.get('attendees', [])
+            attendees = event.attendees
             if len(attendees) > 1: 
                 # Start and end times
-                start_info = event.get('start', {})
-                end_info = event.get('end', {})
+                start_info = event.start
+                end_info = event.end
                 
                 start_time = start_info.get('dateTime', start_info.get('date'))
                 end_time = end_info.get('dateTime', end_info.get('date'))
@@ -184,141 +546,157 @@ class GoogleCalendarService:
                 duration_minutes = None
                 if start_time and end_time:
                     try:
-                        start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                        end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+                        start_dt = _parse_datetime(start_time)
+                        end_dt = _parse_datetime(end_time)
                         duration_minutes = (end_dt - start_dt).total_seconds() / 60
                     except Exception as e:
-                        logger.warning(f"Could not calculate duration for event {event.get('id')}: {e}")
+                        logger.warning(f"Could not calculate duration for event {event.id}: {e}")
                 
                 # Attendee info
-                attendee_emails = []
+                attendee_emails = [attendee['email'] for attendee in attendees if attendee.get('email')]
                 attendee_count = len(attendees)
-                for attendee in attendees:
-                    email = attendee.get('email')
-                    if email:
-                        attendee_emails.append(email)
                 
                 meeting_info = {
-                    'event_id': event.get('id'),
-                    'title': event.get('summary', 'No Title'),
+                    'event_id': event.id,
+                    'title': event.summary,
                     'start_time': start_time,
                     'end_time': end_time,
                     'duration_minutes': duration_minutes,
-                    'organizer_email': event.get('organizer', {}).get('email'),
+                    'organizer_email': event.organizer.get('email'),
                     'attendee_count': attendee_count,
                     'attendee_emails': attendee_emails,
-                    'hangout_link': event.get('hangout_link'),
-                    'location': event.get('location', ''),
-                    'description': event.get('description', ''),
-                    'created': event.get('created'),
-                    'updated': event.get('updated'),
-                    'status': event.get('status'),
-                    'conference_data': event.get('conference_data')
+                    'hangout_link': event.hangout_link,
+                    'location': event.location,
+                    'description': event.description,
+                    'created': event.created,
+                    'updated': event.updated,
+                    'status': event.status,
+                    'conference_data': event.conference_data
                 }
                 meeting_data.append(meeting_info)
         
         logger.info(f"Processed {len(meeting_data)} meetings from {len(events)} total events")
         return meeting_data
     
-    def fetch_calendar_data(self, start_date, end_date):
+    def fetch_calendar_data(self, start_date, end_date, calendar_ids: Optional[List[str]] = None):
         """Fetch calendar data for historical data fetching - compatible with database format"""
-        events = self.get_events(
-            start_date=start_date,
-            end_date=end_date,
-            max_results=2500  # Higher limit for historical fetching
-        )
+        meeting_data = list(self.iter_calendar_data(start_date, end_date, calendar_ids))
+        logger.info(f"Fetched {len(meeting_data)} meetings for database storage")
+        return meeting_data
+    
+    def iter_calendar_data(self, start_date, end_date, calendar_ids: Optional[List[str]] = None):
+        """Yield database-format meeting records one at a time
+        
+        When calendar_ids is given, all calendars are fetched together through
+        get_events_batched instead of one blocking request per calendar.
+        """
+        if calendar_ids:
+            events_by_calendar = self.get_events_batched(calendar_ids, start_date=start_date, end_date=end_date)
+        else:
+            events_by_calendar = {
+                'primary': self.get_events(
+                    start_date=start_date,
+                    end_date=end_date,
+                    max_results=MAX_EVENTS_PER_PAGE  # Higher limit for historical fetching
+                )
+            }
+        
+        for calendar_id, events in events_by_calendar.items():
+            for event in events:
+                meeting_record = self._to_meeting_record(event, calendar_id)
+                if meeting_record is not None:
+                    yield meeting_record
+    
+    def sync_calendar_data(self, calendar_id: str = 'primary', sync_token: Optional[str] = None, start_date=None):
+        """Incremental counterpart of fetch_calendar_data
+        
+        Returns (meeting records, cancelled event ids, next sync token); the token
+        is None if the sync failed.
+        """
+        events, next_sync_token = self.get_events_incremental(calendar_id, sync_token, start_date)
         
         meeting_data = []
+        cancelled_ids = []
         for event in events:
-            # Process all events, not just meetings with multiple attendees
-            attendees = event.get('attendees', [])
-            
-            # Extract start and end times
-            start_info = event.get('start', {})
-            end_info = event.get('end', {})
-            
-            start_time = start_info.get('dateTime', start_info.get('date'))
-            end_time = end_info.get('dateTime', end_info.get('date'))
-            
-            if not start_time or not end_time:
-                continue  # Skip events without proper time information
-            
-            # Calculate duration
-            duration_minutes = None
-            try:
-                start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                duration_minutes = int((end_dt - start_dt).total_seconds() / 60)
-            except Exception as e:
-                logger.warning(f"Could not calculate duration for event {event.get('id')}: {e}")
+            if event.status == 'cancelled':
+                cancelled_ids.append(event.id)
                 continue
-            
-            # Extract organizer info
-            organizer = event.get('organizer', {})
-            organizer_email = organizer.get('email', 'unknown@domain.com')
-            
-            # Count attendees by status
-            attendees_accepted = 0
-            attendees_declined = 0
-            attendees_tentative = 0
-            attendees_needs_action = 0
-            attendees_accepted_emails = []
-            
-            for attendee in attendees:
-                response_status = attendee.get('responseStatus', 'needsAction')
-                if response_status == 'accepted':
-                    attendees_accepted += 1
-                    attendees_accepted_emails.append(attendee.get('email', ''))
-                elif response_status == 'declined':
-                    attendees_declined += 1
-                elif response_status == 'tentative':
-                    attendees_tentative += 1
-                elif response_status == 'needsAction':
-                    attendees_needs_action += 1
-            
-            # Determine meeting characteristics
-            attendees_count = len(attendees)
-            is_one_on_one = attendees_count == 2
-            meet_link = event.get('hangoutLink', '')
-            if not meet_link and event.get('conferenceData'):
-                # Try to extract meet link from conference data
-                entry_points = event.get('conferenceData', {}).get('entryPoints', [])
-                for entry in entry_points:
-                    if entry.get('entryPointType') == 'video':
-                        meet_link = entry.get('uri', '')
-                        break
-            
-            # Database-compatible format
-            meeting_record = {
-                'event_id': event.get('id'),
-                'calendar_id': 'primary',  # Default calendar
-                'organizer_email': organizer_email,
-                'user_email': organizer_email,  # Use organizer as user for now
-                'summary': event.get('summary', 'No Title'),
-                'start_time': start_dt,
-                'end_time': end_dt,
-                'duration_minutes': duration_minutes,
-                'attendees_count': attendees_count,
-                'attendees_accepted': attendees_accepted,
-                'attendees_declined': attendees_declined,
-                'attendees_tentative': attendees_tentative,
-                'attendees_needs_action': attendees_needs_action,
-                'attendees_accepted_emails': ','.join(attendees_accepted_emails),
-                'meet_link': meet_link,
-                'html_link': event.get('htmlLink', ''),
-                'is_one_on_one': is_one_on_one,
-                'has_manager_attendee': False,  # Would need additional logic to determine
-                'unique_departments': 1,  # Default
-                'departments_list': 'Unknown',  # Would need user mapping
-                'department': 'Unknown',
-                'division': 'Unknown',
-                'subdepartment': 'Unknown',
-                'is_manager': False
-            }
-            meeting_data.append(meeting_record)
+            meeting_record = self._to_meeting_record(event, calendar_id)
+            if meeting_record is not None:
+                meeting_data.append(meeting_record)
         
-        logger.info(f"Fetched {len(meeting_data)} meetings for database storage")
-        return meeting_data
+        return meeting_data, cancelled_ids, next_sync_token
+    
+    @staticmethod
+    def _to_meeting_record(event: _EventView, calendar_id: str = 'primary') -> Optional['MeetingRecord']:
+        """Convert a processed event to the database record format, or None if it has no usable times"""
+        # Extract start and end times; all-day events only carry a 'date' and are
+        # not meetings, so skip them before doing any parsing
+        start_time = event.start.get('dateTime')
+        end_time = event.end.get('dateTime')
+        
+        if not start_time or not end_time:
+            return None  # Skip events without proper time information
+        
+        # Process all timed events, not just meetings with multiple attendees
+        attendees = event.attendees
+        
+        # Calculate duration
+        duration_minutes = None
+        try:
+            start_dt = _parse_datetime(start_time)
+            end_dt = _parse_datetime(end_time)
+            duration_minutes = int((end_dt - start_dt).total_seconds() / 60)
+        except Exception as e:
+            logger.warning(f"Could not calculate duration for event {event.id}: {e}")
+            return None
+        
+        # Extract organizer info
+        organizer = event.organizer
+        organizer_email = organizer.get('email', 'unknown@domain.com')
+        
+        # Count attendees by status
+        statuses = [attendee.get('responseStatus', 'needsAction') for attendee in attendees]
+        status_counts = Counter(statuses)
+        attendees_accepted = status_counts['accepted']
+        attendees_declined = status_counts['declined']
+        attendees_tentative = status_counts['tentative']
+        attendees_needs_action = status_counts['needsAction']
+        attendees_accepted_emails = [
+            attendee.get('email', '') for attendee, status in zip(attendees, statuses) if status == 'accepted'
+        ]
+        
+        # Determine meeting characteristics
+        attendees_count = len(attendees)
+        is_one_on_one = attendees_count == 2
+        meet_link = event.hangout_link or ''
+        if not meet_link and event.conference_data:
+            # Try to extract meet link from conference data
+            entry_points = event.conference_data.get('entryPoints', [])
+            for entry in entry_points:
+                if entry.get('entryPointType') == 'video':
+                    meet_link = entry.get('uri', '')
+                    break
+        
+        return MeetingRecord(
+            event_id=event.id,
+            calendar_id=calendar_id,
+            organizer_email=organizer_email,
+            user_email=organizer_email,  # Use organizer as user for now
+            summary=event.summary,
+            start_time=start_dt,
+            end_time=end_dt,
+            duration_minutes=duration_minutes,
+            attendees_count=attendees_count,
+            attendees_accepted=attendees_accepted,
+            attendees_declined=attendees_declined,
+            attendees_tentative=attendees_tentative,
+            attendees_needs_action=attendees_needs_action,
+            attendees_accepted_emails=attendees_accepted_emails,
+            meet_link=meet_link,
+            html_link=event.html_link or '',
+            is_one_on_one=is_one_on_one
+        )
 
 def test_oauth2_calendar_service():
     """Test the OAuth2 calendar service"""
@@ -8,7 +8,6 @@ import os
 import sys
 import logging
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -18,6 +17,86 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Full schema, executed as a single multi-statement transaction
+SCHEMA_DDL = """
+    DROP TABLE IF EXISTS meetings CASCADE;
+    DROP TABLE IF EXISTS users CASCADE;
+    DROP TABLE IF EXISTS fetch_history CASCADE;
+    DROP TABLE IF EXISTS calendar_sync_state CASCADE;
+
+    CREATE TABLE meetings (
+        id SERIAL PRIMARY KEY,
+        user_email TEXT NOT NULL,
+        department TEXT,
+        division TEXT,
+        subdepartment TEXT,
+        is_manager BOOLEAN DEFAULT FALSE,
+        start_time TIMESTAMP NOT NULL,
+        end_time TIMESTAMP NOT NULL,
+        duration_minutes INTEGER,
+        attendees_count SMALLINT DEFAULT 0,
+        attendees_accepted SMALLINT DEFAULT 0,
+        attendees_declined SMALLINT DEFAULT 0,
+        attendees_tentative SMALLINT DEFAULT 0,
+        attendees_needs_action SMALLINT DEFAULT 0,
+        attendees_accepted_emails TEXT[],
+        summary TEXT,
+        meet_link TEXT,
+        html_link TEXT,
+        is_one_on_one BOOLEAN DEFAULT FALSE,
+        has_manager_attendee BOOLEAN DEFAULT FALSE,
+        unique_departments SMALLINT DEFAULT 1,
+        departments_list TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        event_id TEXT UNIQUE,
+        calendar_id TEXT,
+        organizer_email TEXT
+    ) WITH (fillfactor = 85);
+
+    CREATE TABLE users (
+        id SERIAL PRIMARY KEY,
+        email TEXT UNIQUE NOT NULL,
+        department TEXT,
+        division TEXT,
+        subdepartment TEXT,
+        is_manager BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Tracks data fetching runs
+    CREATE TABLE fetch_history (
+        id SERIAL PRIMARY KEY,
+        fetch_date DATE NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE NOT NULL,
+        status TEXT NOT NULL,
+        records_fetched INTEGER DEFAULT 0,
+        error_message TEXT,
+        fetch_type TEXT DEFAULT 'manual',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Last Calendar API sync token per calendar, for incremental fetches
+    CREATE TABLE calendar_sync_state (
+        calendar_id TEXT PRIMARY KEY,
+        sync_token TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Composite indexes match the (user|department, date range) filters; INCLUDE
+    -- columns let the aggregates run as index-only scans. event_id is already
+    -- indexed by its UNIQUE constraint.
+    CREATE INDEX idx_meetings_user_time ON meetings(user_email, start_time DESC)
+        INCLUDE (duration_minutes, attendees_count, is_one_on_one);
+    CREATE INDEX idx_meetings_dept_time ON meetings(department, start_time DESC)
+        INCLUDE (duration_minutes);
+    CREATE INDEX idx_meetings_start_time ON meetings(start_time);
+    CREATE INDEX idx_meetings_accepted_emails_gin ON meetings USING GIN (attendees_accepted_emails);
+    CREATE INDEX idx_users_email ON users(email);
+    CREATE INDEX idx_fetch_history_date ON fetch_history(fetch_date);
+"""
+
 def get_db_connection_params():
     """Get database connection parameters from environment variables"""
     return {
@@ -63,94 +142,16 @@ def cleanup_database():
                 connect_timeout=30
             )
         
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
         cursor = conn.cursor()
         
         logger.info("Connected to database successfully")
         
-        # Drop existing tables if they exist
-        logger.info("Dropping existing tables...")
-        cursor.execute("DROP TABLE IF EXISTS meetings CASCADE")
-        cursor.execute("DROP TABLE IF EXISTS users CASCADE")
-        cursor.execute("DROP TABLE IF EXISTS fetch_history CASCADE")
-        logger.info("Existing tables dropped")
-        
-        # Create meetings table
-        logger.info("Creating meetings table...")
-        cursor.execute('''
-            CREATE TABLE meetings (
-                id SERIAL PRIMARY KEY,
-                user_email TEXT NOT NULL,
-                department TEXT,
-                division TEXT,
-                subdepartment TEXT,
-                is_manager BOOLEAN DEFAULT FALSE,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP NOT NULL,
-                duration_minutes INTEGER,
-                attendees_count INTEGER DEFAULT 0,
-                attendees_accepted INTEGER DEFAULT 0,
-                attendees_declined INTEGER DEFAULT 0,
-                attendees_tentative INTEGER DEFAULT 0,
-                attendees_needs_action INTEGER DEFAULT 0,
-                attendees_accepted_emails TEXT,
-                summary TEXT,
-                meet_link TEXT,
-                html_link TEXT,
-                is_one_on_one BOOLEAN DEFAULT FALSE,
-                has_manager_attendee BOOLEAN DEFAULT FALSE,
-                unique_departments INTEGER DEFAULT 1,
-                departments_list TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                event_id TEXT UNIQUE,
-                calendar_id TEXT,
-                organizer_email TEXT
-            )
-        ''')
-        logger.info("Meetings table created")
-        
-        # Create users table
-        logger.info("Creating users table...")
-        cursor.execute('''
-            CREATE TABLE users (
-                id SERIAL PRIMARY KEY,
-                email TEXT UNIQUE NOT NULL,
-                department TEXT,
-                division TEXT,
-                subdepartment TEXT,
-                is_manager BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        logger.info("Users table created")
-        
-        # Create fetch history table to track data fetching
-        logger.info("Creating fetch_history table...")
-        cursor.execute('''
-            CREATE TABLE fetch_history (
-                id SERIAL PRIMARY KEY,
-                fetch_date DATE NOT NULL,
-                start_date DATE NOT NULL,
-                end_date DATE NOT NULL,
-                status TEXT NOT NULL,
-                records_fetched INTEGER DEFAULT 0,
-                error_message TEXT,
-                fetch_type TEXT DEFAULT 'manual',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        logger.info("Fetch history table created")
-        
-        # Create indexes for performance
-        logger.info("Creating indexes...")
-        cursor.execute('CREATE INDEX idx_meetings_user_email ON meetings(user_email)')
-        cursor.execute('CREATE INDEX idx_meetings_start_time ON meetings(start_time)')
-        cursor.execute('CREATE INDEX idx_meetings_department ON meetings(department)')
-        cursor.execute('CREATE INDEX idx_meetings_event_id ON meetings(event_id)')
-        cursor.execute('CREATE INDEX idx_users_email ON users(email)')
-        cursor.execute('CREATE INDEX idx_fetch_history_date ON fetch_history(fetch_date)')
-        logger.info("Indexes created")
+        # Drop and recreate the schema in one round trip; DDL is transactional in
+        # Postgres, so a failure part-way leaves the existing tables untouched
+        logger.info("Dropping existing tables and recreating schema...")
+        cursor.execute(SCHEMA_DDL)
+        conn.commit()
+        logger.info("Tables and indexes created")
         
         # Verify tables
         cursor.execute("""
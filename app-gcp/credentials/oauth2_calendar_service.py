@@ -5,15 +5,40 @@ Using OAuth2 flow instead of service account credentials.
 
 import os
 import json
+import functools
 import logging
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, NamedTuple
 
+import google_auth_httplib2
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    # Python 3.11+ fromisoformat accepts the 'Z' suffix directly
+    _parse_datetime = datetime.fromisoformat
+
+# Decoder for credential files and API responses; orjson when installed
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +49,104 @@ CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 CREDENTIALS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'credentials/service-account.json')
 TOKEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'credentials/token.json')
 
+# Socket timeout (seconds) for Calendar API requests
+HTTP_TIMEOUT = 30
+
+# Refresh the access token in the background once it is this close to expiring;
+# larger than google-auth's own inline refresh threshold so foreground calls never block
+TOKEN_REFRESH_LEEWAY = timedelta(minutes=5)
+# Below this remaining lifetime a foreground call waits for the refresh to finish
+TOKEN_EXPIRY_GRACE = timedelta(seconds=60)
+
+# How long (seconds) list_calendars results are reused
+CALENDAR_LIST_TTL = 300
+
+# Worker threads for get_events_multi
+MAX_FETCH_WORKERS = 8
+# Sub-requests allowed in one batch HTTP request
+MAX_BATCH_REQUESTS = 50
+# Client-side cap on Calendar API requests per second, shared by all threads
+MAX_REQUESTS_PER_SECOND = 10
+
+# Partial-response mask: only the event fields read by get_events, plus the paging token
+EVENT_FIELDS = (
+    'nextPageToken,'
+    'items(id,summary,description,start,end,organizer,attendees,hangoutLink,htmlLink,'
+    'location,created,updated,status,conferenceData)'
+)
+
+class _FastJsonModel(JsonModel):
+    """JsonModel that decodes API responses with the fastest available JSON parser"""
+    
+    def deserialize(self, content):
+        body = _json_loads(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+class Event(NamedTuple):
+    """Calendar event fields returned by get_events"""
+    id: str
+    summary: str
+    description: str
+    start: Dict[str, Any]
+    end: Dict[str, Any]
+    organizer: Dict[str, Any]
+    attendees: List[Dict[str, Any]]
+    hangout_link: Optional[str]
+    html_link: Optional[str]
+    location: str
+    created: Optional[str]
+    updated: Optional[str]
+    status: Optional[str]
+    conference_data: Dict[str, Any]
+
+class _TokenBucket:
+    """Thread-safe token bucket limiting how fast API requests are sent"""
+    
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def _pooled_session() -> requests.Session:
+    """requests.Session with a connection pool, used for OAuth token refreshes"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+    session.mount('https://', adapter)
+    return session
+
+# Process-wide transports so every request reuses open keep-alive TLS connections
+_REFRESH_REQUEST = Request(session=_pooled_session())
+_HTTP = httplib2.Http(timeout=HTTP_TIMEOUT)
+
+# Single worker so at most one token refresh is in flight per process
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+_RATE_LIMITER = _TokenBucket(MAX_REQUESTS_PER_SECOND)
+
+def _to_rfc3339(value) -> str:
+    """Format a datetime for timeMin/timeMax; naive datetimes are treated as UTC"""
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is None:
+        return value.isoformat() + 'Z'
+    return value.isoformat()
+
 class GoogleCalendarService:
     """Production Google Calendar service using OAuth2"""
     
@@ -31,6 +154,75 @@ class GoogleCalendarService:
         self.credentials = None
         self.service = None
         self._authenticated = False
+        self._refresh_lock = threading.Lock()
+        self._refresh_future = None
+        self._calendars_cache = None  # (expires_at, calendars)
+        self._auth_expiry_ts = 0.0  # epoch seconds until which no auth checks are needed
+    
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_client_secrets(cls) -> Dict[str, Any]:
+        """Parse the OAuth2 client-secrets file once per process"""
+        with open(CREDENTIALS_FILE, 'rb') as f:
+            return _json_loads(f.read())
+    
+    def _save_token(self):
+        """Write the token file atomically so a crash never leaves it truncated"""
+        token_dir = os.path.dirname(TOKEN_FILE)
+        os.makedirs(token_dir, exist_ok=True)
+        # mkstemp creates a new, uniquely named file with owner-only permissions, so concurrent
+        # writers never share a temp file and the token is never readable by others
+        fd, tmp_file = tempfile.mkstemp(dir=token_dir, prefix='.token-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as token:
+                token.write(self.credentials.to_json())
+            os.replace(tmp_file, TOKEN_FILE)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+    
+    def _refresh_token(self):
+        """Refresh the access token and persist it"""
+        try:
+            self.credentials.refresh(_REFRESH_REQUEST)
+            self._save_token()
+            logger.info("Token refreshed ahead of expiry")
+        except Exception as e:
+            logger.warning(f"Background token refresh failed: {e}")
+    
+    def _ensure_fresh_token(self):
+        """Start a background refresh when the token is close to expiring"""
+        if not self.credentials or not self.credentials.expiry or not self.credentials.refresh_token:
+            return
+        
+        # google-auth keeps expiry as a naive UTC datetime
+        remaining = self.credentials.expiry - datetime.now(timezone.utc).replace(tzinfo=None)
+        if remaining >= TOKEN_REFRESH_LEEWAY:
+            return
+        
+        with self._refresh_lock:
+            if self._refresh_future is None or self._refresh_future.done():
+                self._refresh_future = _REFRESH_EXECUTOR.submit(self._refresh_token)
+            refresh_future = self._refresh_future
+        
+        if remaining < TOKEN_EXPIRY_GRACE:
+            refresh_future.result()
+    
+    def _ensure_authenticated(self) -> bool:
+        """Authenticate on first use and keep the token fresh; a single clock comparison while it is far from expiry"""
+        if time.time() < self._auth_expiry_ts:
+            return True
+        
+        if not self._authenticated and not self.authenticate():
+            return False
+        self._ensure_fresh_token()
+        
+        # Skip the checks above until the token enters its refresh window
+        expiry = self.credentials.expiry
+        if expiry:
+            self._auth_expiry_ts = expiry.replace(tzinfo=timezone.utc).timestamp() - TOKEN_REFRESH_LEEWAY.total_seconds()
+        return True
     
     def authenticate(self) -> bool:
         """Authenticate with Google Calendar API using OAuth2"""
@@ -47,8 +239,9 @@ class GoogleCalendarService:
                 if self.credentials and self.credentials.expired and self.credentials.refresh_token:
                     logger.info("Refreshing expired token...")
                     try:
-                        self.credentials.refresh(Request())
+                        self.credentials.refresh(_REFRESH_REQUEST)
                         logger.info("Token refreshed successfully")
+                        self._save_token()
                     except Exception as e:
                         logger.warning(f"Failed to refresh token: {e}")
                         self.credentials = None
@@ -61,26 +254,25 @@ class GoogleCalendarService:
                         return False
                     
                     # Check if it's OAuth2 client credentials
-                    with open(CREDENTIALS_FILE, 'r') as f:
-                        cred_info = json.load(f)
-                        if 'installed' not in cred_info:
-                            logger.error("Credentials file is not OAuth2 client credentials")
-                            return False
+                    client_config = self._load_client_secrets()
+                    if 'installed' not in client_config:
+                        logger.error("Credentials file is not OAuth2 client credentials")
+                        return False
                     
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        CREDENTIALS_FILE, CALENDAR_SCOPES)
+                    flow = InstalledAppFlow.from_client_config(client_config, CALENDAR_SCOPES)
                     
                     # Run OAuth flow
                     self.credentials = flow.run_local_server(port=8080)
                     
                     # Save credentials for next run
-                    os.makedirs(os.path.dirname(TOKEN_FILE), exist_ok=True)
-                    with open(TOKEN_FILE, 'w') as token:
-                        token.write(self.credentials.to_json())
+                    self._save_token()
                     logger.info("OAuth2 credentials saved")
             
             # Build the service
-            self.service = build('calendar', 'v3', credentials=self.credentials)
+            authed_http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=_HTTP)
+            # static_discovery loads the discovery document bundled with googleapiclient
+            self.service = build('calendar', 'v3', http=authed_http, static_discovery=True, cache_discovery=False,
+                                 model=_FastJsonModel())
             self._authenticated = True
             logger.info("Google Calendar service authenticated successfully")
             return True
@@ -91,14 +283,17 @@ class GoogleCalendarService:
     
     def list_calendars(self) -> List[Dict[str, Any]]:
         """List all accessible calendars"""
-        if not self._authenticated:
-            if not self.authenticate():
-                return []
+        if not self._ensure_authenticated():
+            return []
+        
+        if self._calendars_cache and self._calendars_cache[0] > time.monotonic():
+            return self._calendars_cache[1]
         
         try:
             calendar_list = self.service.calendarList().list().execute()
             calendars = calendar_list.get('items', [])
             logger.info(f"Found {len(calendars)} calendars")
+            self._calendars_cache = (time.monotonic() + CALENDAR_LIST_TTL, calendars)
             return calendars
         except HttpError as e:
             logger.error(f"Error listing calendars: {e}")
@@ -107,69 +302,165 @@ class GoogleCalendarService:
             logger.error(f"Unexpected error listing calendars: {e}")
             return []
     
+    @staticmethod
+    def _format_time_range(start_date: Optional[datetime], end_date: Optional[datetime]):
+        """Return (timeMin, timeMax) strings for the API, defaulting to the last 30 days"""
+        # Default to last 30 days if no dates provided
+        if not end_date:
+            end_date = datetime.now(timezone.utc)
+        if not start_date:
+            start_date = end_date - timedelta(days=30)
+        
+        return _to_rfc3339(start_date), _to_rfc3339(end_date)
+    
+    def _iter_raw_events(self, calendar_id: str, time_min: str, time_max: str,
+                         page_size: int = 100, http=None):
+        """Yield raw API events from every page of one calendar; pass http when calling from a worker thread"""
+        page_token = None
+        while True:
+            _RATE_LIMITER.acquire()
+            events_result = self.service.events().list(
+                calendarId=calendar_id,
+                timeMin=time_min,
+                timeMax=time_max,
+                maxResults=page_size,
+                singleEvents=True,
+                orderBy='startTime',
+                pageToken=page_token,
+                fields=EVENT_FIELDS
+            ).execute(http=http)
+            
+            yield from events_result.get('items', [])
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                return
+    
+    def get_events_multi(self,
+                         calendar_ids: List[str],
+                         start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Get raw events for several calendars concurrently, keyed by calendar id"""
+        if not self._ensure_authenticated():
+            return {}
+        
+        time_min, time_max = self._format_time_range(start_date, end_date)
+        
+        def _fetch(calendar_id):
+            # httplib2 is not thread-safe, so each worker gets its own connection
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+            try:
+                return list(self._iter_raw_events(calendar_id, time_min, time_max, http=http))
+            except Exception as e:
+                logger.error(f"Error fetching events from {calendar_id}: {e}")
+                return []
+        
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            results = dict(zip(calendar_ids, executor.map(_fetch, calendar_ids)))
+        
+        logger.info(f"Found {sum(len(events) for events in results.values())} events across {len(calendar_ids)} calendars")
+        return results
+    
+    def get_events_batch(self,
+                         calendar_ids: Optional[List[str]] = None,
+                         start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None,
+                         page_size: int = 250) -> Dict[str, List[Dict[str, Any]]]:
+        """Get raw events for several calendars (all listed calendars by default) with batch requests
+        
+        One multipart HTTP request carries the events.list call for up to 50
+        calendars; follow-up pages are batched the same way.
+        """
+        if not self._ensure_authenticated():
+            return {}
+        
+        if calendar_ids is None:
+            calendar_ids = [calendar['id'] for calendar in self.list_calendars()]
+        
+        time_min, time_max = self._format_time_range(start_date, end_date)
+        results = {calendar_id: [] for calendar_id in calendar_ids}
+        pending = {calendar_id: None for calendar_id in calendar_ids}  # calendar_id -> page token
+        
+        try:
+            while pending:
+                next_pending = {}
+                
+                def _collect(request_id, response, exception):
+                    if exception is not None:
+                        logger.error(f"Error fetching events from {request_id}: {exception}")
+                        return
+                    results[request_id].extend(response.get('items', []))
+                    if response.get('nextPageToken'):
+                        next_pending[request_id] = response['nextPageToken']
+                
+                calendar_batch = list(pending)
+                for offset in range(0, len(calendar_batch), MAX_BATCH_REQUESTS):
+                    batch = self.service.new_batch_http_request(callback=_collect)
+                    for calendar_id in calendar_batch[offset:offset + MAX_BATCH_REQUESTS]:
+                        batch.add(
+                            self.service.events().list(
+                                calendarId=calendar_id,
+                                timeMin=time_min,
+                                timeMax=time_max,
+                                maxResults=page_size,
+                                singleEvents=True,
+                                orderBy='startTime',
+                                pageToken=pending[calendar_id],
+                                fields=EVENT_FIELDS
+                            ),
+                            request_id=calendar_id
+                        )
+                    _RATE_LIMITER.acquire()
+                    batch.execute()
+                
+                pending = next_pending
+        except HttpError as e:
+            logger.error(f"Error fetching batched events: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unexpected error fetching batched events: {e}")
+            return {}
+        
+        logger.info(f"Found {sum(len(events) for events in results.values())} events across {len(calendar_ids)} calendars")
+        return results
+    
     def get_events(self, 
                    calendar_id: str = 'primary',
                    start_date: Optional[datetime] = None,
                    end_date: Optional[datetime] = None,
-                   max_results: int = 100) -> List[Dict[str, Any]]:
+                   max_results: int = 100) -> List[Event]:
         """Get calendar events for specified date range"""
-        if not self._authenticated:
-            if not self.authenticate():
-                return []
+        if not self._ensure_authenticated():
+            return []
         
         try:
-            # Default to last 30 days if no dates provided
-            if not end_date:
-                end_date = datetime.now(timezone.utc)
-            if not start_date:
-                start_date = end_date - timedelta(days=30)
-            
-            logger.info(f"Fetching events from {calendar_id} between {start_date} and {end_date}")
+            time_min, time_max = self._format_time_range(start_date, end_date)
             
-            # Ensure dates are properly formatted for the API
-            time_min = start_date.isoformat() if hasattr(start_date, 'isoformat') else start_date
-            time_max = end_date.isoformat() if hasattr(end_date, 'isoformat') else end_date
+            logger.info(f"Fetching events from {calendar_id} between {time_min} and {time_max}")
             
-            # Add 'Z' suffix if timezone info is missing
-            if not time_min.endswith('Z') and '+' not in time_min and time_min.count(':') == 2:
-                time_min += 'Z'
-            if not time_max.endswith('Z') and '+' not in time_max and time_max.count(':') == 2:
-                time_max += 'Z'
+            events = list(self._iter_raw_events(calendar_id, time_min, time_max, max_results))
             
-            events_result = self.service.events().list(
-                calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
             logger.info(f"Found {len(events)} events")
             
             # Process events to extract useful information
-            processed_events = []
-            for event in events:
-                processed_event = {
-                    'id': event.get('id'),
-                    'summary': event.get('summary', 'No Title'),
-                    'description': event.get('description', ''),
-                    'start': event.get('start', {}),
-                    'end': event.get('end', {}),
-                    'organizer': event.get('organizer', {}),
-                    'attendees': event.get('attendees', []),
-                    'hangout_link': event.get('hangoutLink'),
-                    'html_link': event.get('htmlLink'),
-                    'location': event.get('location', ''),
-                    'created': event.get('created'),
-                    'updated': event.get('updated'),
-                    'status': event.get('status'),
-                    'conference_data': event.get('conferenceData', {})
-                }
-                processed_events.append(processed_event)
-            
-            return processed_events
+            return [
+                Event(
+                    id=event.get('id'),
+                    summary=event.get('summary', 'No Title'),
+                    description=event.get('description', ''),
+                    start=event.get('start', {}),
+                    end=event.get('end', {}),
+                    organizer=event.get('organizer', {}),
+                    attendees=event.get('attendees', []),
+                    hangout_link=event.get('hangoutLink'),
+                    html_link=event.get('htmlLink'),
+                    location=event.get('location', ''),
+                    created=event.get('created'),
+                    updated=event.get('updated'),
+                    status=event.get('status'),
+                    conference_data=event.get('conferenceData', {})
+                )
+                for event in events
+            ]
             
         except HttpError as e:
             logger.error(f"Error fetching events: {e}")
@@ -179,62 +470,95 @@ class GoogleCalendarService:
             return []
     
     def get_meeting_data(self, days_back: int = 7) -> List[Dict[str, Any]]:
-        """Get meeting data with enhanced processing for analytics"""
-        events = self.get_events(
-            start_date=datetime.now(timezone.utc) - timedelta(days=days_back),
-            end_date=datetime.now(timezone.utc)
-        )
+        """Get meeting data with enhanced processing for analytics
+        
+        Reads raw API events in a single streaming pass, without building the
+        intermediate Event list that get_events returns.
+        """
+        if not self._ensure_authenticated():
+            return []
+        
+        now = datetime.now(timezone.utc)
+        time_min, time_max = self._format_time_range(now - timedelta(days=days_back), now)
         
         meeting_data = []
-        for event in events:
-            attendees = event.get('attendees', [])
-            if not attendees:
-                continue
+        total_events = 0
+        try:
+            for event in self._iter_raw_events('primary', time_min, time_max):
+                total_events += 1
+                get = event.get
+                attendees = get('attendees')
+                if not attendees:
+                    continue
 
-            start_info = event.get('start', {})
-            end_info = event.get('end', {})
-            start_time_str = start_info.get('dateTime', start_info.get('date'))
-            end_time_str = end_info.get('dateTime', end_info.get('date'))
+                start_info = get('start', {})
+                end_info = get('end', {})
+                start_time_str = start_info.get('dateTime', start_info.get('date'))
+                end_time_str = end_info.get('dateTime', end_info.get('date'))
 
-            if not start_time_str or not end_time_str:
-                continue
+                if not start_time_str or not end_time_str:
+                    continue
 
-            try:
-                start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-            except ValueError:
-                logger.warning(f"Could not parse time for event {event.get('id')}")
-                continue
+                try:
+                    start_time = _parse_datetime(start_time_str)
+                    end_time = _parse_datetime(end_time_str)
+                except ValueError:
+                    logger.warning(f"Could not parse time for event {get('id')}")
+                    continue
 
-            is_one_on_one = len(attendees) == 2
-            organizer = event.get('organizer', {})
+                is_one_on_one = len(attendees) == 2
+                organizer = get('organizer', {})
+                
+                # Tally response statuses in one pass over the attendees
+                status_counts = {'accepted': 0, 'declined': 0, 'tentative': 0, 'needsAction': 0}
+                for attendee in attendees:
+                    status = attendee.get('responseStatus')
+                    if status in status_counts:
+                        status_counts[status] += 1
 
-            meeting = {
-                'user_email': organizer.get('email', 'unknown'),
-                'start_time': start_time,
-                'end_time': end_time,
-                'duration_minutes': (end_time - start_time).total_seconds() / 60,
-                'attendees_count': len(attendees),
-                'attendees_accepted': len([a for a in attendees if a.get('responseStatus') == 'accepted']),
-                'attendees_declined': len([a for a in attendees if a.get('responseStatus') == 'declined']),
-                'attendees_tentative': len([a for a in attendees if a.get('responseStatus') == 'tentative']),
-                'attendees_needs_action': len([a for a in attendees if a.get('responseStatus') == 'needsAction']),
-                'summary': event.get('summary', 'No Title'),
-                'meet_link': event.get('hangoutLink'),
-                'html_link': event.get('htmlLink'),
-                'is_one_on_one': is_one_on_one
-            }
-            meeting_data.append(meeting)
+                meeting = {
+                    'user_email': organizer.get('email', 'unknown'),
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'duration_minutes': (end_time - start_time).total_seconds() / 60,
+                    'attendees_count': len(attendees),
+                    'attendees_accepted': status_counts['accepted'],
+                    'attendees_declined': status_counts['declined'],
+                    'attendees_tentative': status_counts['tentative'],
+                    'attendees_needs_action': status_counts['needsAction'],
+                    'summary': get('summary', 'No Title'),
+                    'meet_link': get('hangoutLink'),
+                    'html_link': get('htmlLink'),
+                    'is_one_on_one': is_one_on_one
+                }
+                meeting_data.append(meeting)
+        except HttpError as e:
+            logger.error(f"Error fetching events: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Unexpected error fetching events: {e}")
+            return []
         
-        logger.info(f"Processed {len(meeting_data)} meetings from {len(events)} total events")
+        logger.info(f"Processed {len(meeting_data)} meetings from {total_events} total events")
         return meeting_data
 
+_SERVICE_SINGLETON: Optional[GoogleCalendarService] = None
+_SINGLETON_LOCK = threading.Lock()
+
+def get_calendar_service() -> GoogleCalendarService:
+    """Return the process-wide GoogleCalendarService, creating it on first use"""
+    global _SERVICE_SINGLETON
+    with _SINGLETON_LOCK:
+        if _SERVICE_SINGLETON is None:
+            _SERVICE_SINGLETON = GoogleCalendarService()
+        return _SERVICE_SINGLETON
+
 def test_oauth2_calendar_service():
     """Test the OAuth2 calendar service"""
     logger.info("=== Testing OAuth2 Calendar Service ===")
     
     # Initialize service
-    calendar_service = GoogleCalendarService()
+    calendar_service = get_calendar_service()
     
     # Test authentication
     if not calendar_service.authenticate():
@@ -9,10 +9,13 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta, date
+import io
 import logging
+import time
 import numpy as np
+import pyarrow as pa
 
-from database import get_meetings_data, get_user_data, init_database, check_db_health, get_filter_options, get_summary_stats
+from database import fetch_meetings_data, meetings_cache_generation, get_user_data, init_database, check_db_health, get_filter_options, get_summary_stats
 
 # Configure page
 st.set_page_config(
@@ -26,17 +29,144 @@ st.set_page_config(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_meetings_data(start_date=None, end_date=None, department=None, user_email=None, limit=10000):
-    """Load meetings data from Cloud SQL PostgreSQL database with filtering and limits"""
-    try:
-        df = get_meetings_data(start_date, end_date, department, user_email, limit)
-        logger.info(f"Loaded {len(df)} meetings from Cloud SQL database")
-        return df
+# Low-cardinality text columns stored as pandas categoricals; department, division, meeting_size,
+# day_of_week and time_of_day already arrive as categoricals from get_meetings_data
+CATEGORY_COLUMNS = ('user_email',)
+
+# Free-text columns stored as Arrow-backed strings
+TEXT_COLUMNS = ('summary', 'meet_link')
+
+# Integer count columns downcast to the smallest fitting dtype
+INTEGER_COLUMNS = ('duration_minutes', 'attendees_count', 'attendees_accepted',
+                   'attendees_declined', 'attendees_tentative', 'attendees_needs_action')
+
+# Rows written per chunk when exporting CSV
+CSV_EXPORT_CHUNK_ROWS = 5000
+
+# Per-meeting columns totalled for the summary stats when present
+SUMMED_COLUMNS = ('attendees_accepted', 'attendees_declined', 'attendees_tentative',
+                  'attendees_needs_action', 'is_one_on_one')
+
+# Maximum number of users offered for a sidebar search
+USER_SEARCH_MAX_RESULTS = 20
+
+# Number of bins for the duration histogram
+DURATION_BINS = 20
+
+# Largest marker diameter (px) in the efficiency scatter
+SCATTER_MAX_MARKER_SIZE = 20
+
+# Efficiency scatter is downsampled with LTTB above this many points
+SCATTER_MAX_POINTS = 3000
+
+# Rows shown in the detailed meetings table
+DETAIL_TABLE_ROWS = 50
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points preserving the shape of (x, y)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    # First and last points are always kept; the rest are split into equal buckets
+    bucket_edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = bucket_edges[i], bucket_edges[i + 1]
+        # Average of the next bucket (or the last point) as the third triangle vertex
+        next_end = bucket_edges[i + 2] if i + 2 < len(bucket_edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
         
-    except Exception as e:
-        logger.error(f"Error loading data from Cloud SQL: {e}")
-        st.error(f"Error connecting to Cloud SQL database: {e}")
-        return pd.DataFrame()
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(areas.argmax())
+        selected[i + 1] = prev
+    
+    return selected
+
+def mean_by_category(categories, values):
+    """Mean of values per observed category using np.bincount over the category codes"""
+    if not isinstance(categories.dtype, pd.CategoricalDtype):
+        categories = categories.astype('category')
+    codes = categories.cat.codes.to_numpy()
+    values = values.to_numpy(dtype=np.float64)
+    
+    # Skip missing categories (code -1) and missing values, as groupby().mean() does
+    valid = (codes >= 0) & ~np.isnan(values)
+    n_categories = len(categories.cat.categories)
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=n_categories)
+    counts = np.bincount(codes[valid], minlength=n_categories)
+    
+    observed = counts > 0
+    return pd.Series(sums[observed] / counts[observed], index=categories.cat.categories[observed])
+
+def optimize_dtypes(df):
+    """Convert low-cardinality strings to categoricals, other text to Arrow strings and downcast numeric columns"""
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('string[pyarrow]')
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    if 'efficiency_score' in df.columns:
+        df['efficiency_score'] = pd.to_numeric(df['efficiency_score'], downcast='float')
+    return df
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)  # Keyed by the filter arguments and generation
+def load_meetings_data(start_date=None, end_date=None, department=None, user_email=None, limit=10000,
+                       one_on_one_only=False, generation=''):
+    """
+    Load meetings data from Cloud SQL PostgreSQL database with filtering and limits.
+    Database errors propagate, so a failed load is not cached. generation is the
+    meetings_cache_generation() token, so writes to meetings start a fresh load.
+    
+    Returns the frame and the time it was loaded, which identifies this load in
+    the caches of values derived from the frame.
+    """
+    df = fetch_meetings_data(start_date, end_date, department, user_email, limit,
+                             one_on_one_only=one_on_one_only)
+    df = optimize_dtypes(df)
+    if 'start' in df.columns:
+        # Month label used by the trend chart, derived once per load
+        df['_month'] = df['start'].dt.to_period('M').astype(str)
+    logger.info(f"Loaded {len(df)} meetings from Cloud SQL database")
+    return df, time.time()
+
+def export_csv(df):
+    """Encode the dataframe as UTF-8 CSV bytes, written in chunks to bound peak memory"""
+    buffer = io.BytesIO()
+    # Leave out internal helper columns such as _month
+    columns = [col for col in df.columns if not str(col).startswith('_')]
+    for start in range(0, len(df), CSV_EXPORT_CHUNK_ROWS):
+        df.iloc[start:start + CSV_EXPORT_CHUNK_ROWS].to_csv(buffer, columns=columns, index=False,
+                                                            header=(start == 0))
+    return buffer.getvalue()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_user_search_index(users):
+    """Pair each user email with its lowercase form for case-insensitive search"""
+    return list(users), [user.lower() for user in users]
+
+def search_users(users, users_lower, query, max_results=USER_SEARCH_MAX_RESULTS):
+    """Return up to max_results users whose email contains query, stopping at the last match needed"""
+    query = query.lower()
+    matches = []
+    for user, user_lower in zip(users, users_lower):
+        if query in user_lower:
+            matches.append(user)
+            if len(matches) == max_results:
+                break
+    return matches
 
 def create_sidebar_filters():
     """Create optimized sidebar filters"""
@@ -79,7 +209,7 @@ def create_sidebar_filters():
         user_search = st.sidebar.text_input("Search user email:")
         
         if user_search:
-            filtered_users = [u for u in users if user_search.lower() in u.lower()][:20]
+            filtered_users = search_users(*get_user_search_index(users), user_search)
             if filtered_users:
                 filters['user_email'] = st.sidebar.selectbox(
                     "Select User",
@@ -105,197 +235,274 @@ def create_sidebar_filters():
     
     return filters
 
-def apply_filters(df, filters):
-    """Apply filters to the dataframe"""
-    if df.empty:
-        return df
-    
-    filtered_df = df.copy()
-    
-    # Date range filter
-    if 'start_date' in filters and filters['start_date']:
-        filtered_df = filtered_df[filtered_df['start'].dt.date >= filters['start_date']]
-    
-    if 'end_date' in filters and filters['end_date']:
-        filtered_df = filtered_df[filtered_df['start'].dt.date <= filters['end_date']]
-    
-    # Department filter
-    if filters.get('department') and filters['department'] != 'All':
-        filtered_df = filtered_df[filtered_df['department'] == filters['department']]
-    
-    # User filter
-    if filters.get('user_email') and filters['user_email'] != 'All':
-        filtered_df = filtered_df[filtered_df['user_email'] == filters['user_email']]
-    
-    # 1-on-1 meetings filter
-    if filters.get('one_on_one_only'):
-        filtered_df = filtered_df[filtered_df['is_one_on_one'] == True]
-    
-    return filtered_df
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def compute_meeting_stats(_df, query_key):
+    """Compute the summary scalars shared by the overview and attendee sections in one pass
+
+    The frame is not hashed (leading underscore); the cache is keyed by the
+    load_meetings_data arguments and load time that produced it instead.
+    """
+    df = _df
+    columns = ['duration_minutes', 'attendees_count'] + [col for col in SUMMED_COLUMNS if col in df.columns]
+    
+    # One matrix reduction over all summary columns instead of a scan per metric
+    values = df[columns].to_numpy(dtype=np.float64)
+    totals = dict(zip(columns, np.nansum(values, axis=0)))
+    durations, attendees = values[:, 0], values[:, 1]
+    
+    return {
+        'total_meetings': len(df),
+        'total_duration': totals['duration_minutes'],
+        'avg_duration': np.nanmean(durations),
+        'total_attendees': totals['attendees_count'],
+        'avg_attendees': np.nanmean(attendees),
+        'max_attendees': np.nanmax(attendees),
+        'accepted': totals.get('attendees_accepted', 0),
+        'declined': totals.get('attendees_declined', 0),
+        'tentative': totals.get('attendees_tentative', 0),
+        'needs_action': totals.get('attendees_needs_action', 0),
+        'one_on_one': totals.get('is_one_on_one', 0),
+    }
 
-def display_overview_metrics(df):
+def display_overview_metrics(df, stats):
     """Display enhanced key metrics"""
     if df.empty:
         st.warning("No meeting data available")
         return
     
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        st.metric("Total Meetings", len(df))
-    
-    with col2:
-        total_duration = df['duration_minutes'].sum()
-        hours = int(total_duration // 60)
-        minutes = int(total_duration % 60)
-        st.metric("Total Meeting Time", f"{hours}h {minutes}m")
-    
-    with col3:
-        avg_attendees = df['attendees_count'].mean()
-        st.metric("Avg Attendees", f"{avg_attendees:.1f}")
+    total_duration = stats['total_duration']
+    hours = int(total_duration // 60)
+    minutes = int(total_duration % 60)
+    metrics = [
+        ("Total Meetings", f"{stats['total_meetings']:,}"),
+        ("Total Meeting Time", f"{hours}h {minutes}m"),
+        ("Avg Attendees", f"{stats['avg_attendees']:.1f}"),
+        ("Avg Duration", f"{stats['avg_duration']:.0f} min"),
+    ]
+    
+    for col, (label, value) in zip(st.columns(len(metrics)), metrics):
+        col.metric(label, value)
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def build_attendee_figs(_df, query_key):
+    """Build the attendee analysis charts, cached by the query that loaded the frame"""
+    df = _df
+    figs = {'response': None, 'size': None}
+    
+    # Response rate analysis
+    if 'attendees_accepted' in df.columns and 'attendees_declined' in df.columns:
+        stats = compute_meeting_stats(df, query_key)
+        response_data = {
+            'Accepted': stats['accepted'],
+            'Declined': stats['declined'],
+            'Tentative': stats['tentative'],
+            'No Response': stats['needs_action']
+        }
+        
+        # Only build the chart if there's data
+        if sum(response_data.values()) > 0:
+            figs['response'] = px.pie(
+                values=list(response_data.values()),
+                names=list(response_data.keys()),
+                title="Meeting Response Distribution",
+                color_discrete_sequence=px.colors.qualitative.Set3
+            )
     
-    with col4:
-        avg_duration = df['duration_minutes'].mean()
-        st.metric("Avg Duration", f"{avg_duration:.0f} min")
+    # Meeting size distribution
+    size_counts = df['meeting_size'].value_counts(sort=True, dropna=True)
     
-    with col5:
-        avg_attendees = df['attendees_count'].mean()
-        st.metric("Avg Attendees", f"{avg_attendees:.1f}")
+    figs['size'] = px.bar(
+        x=size_counts.values,
+        y=size_counts.index,
+        orientation='h',
+        title="Meeting Size Distribution",
+        labels={'x': 'Number of Meetings', 'y': 'Meeting Size'}
+    )
+    return figs
 
-def display_attendee_analysis(df):
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def build_attendee_metrics_table(stats):
+    """Build the attendee metrics table from the summary stats"""
+    total_attendees = stats['total_attendees']
+    attendee_metrics = pd.DataFrame({
+        'Metric': [
+            'Total Attendees (all meetings)',
+            'Average Attendees per Meeting',
+            'Most Attendees in Single Meeting',
+            'Average Acceptance Rate',
+            'Average Decline Rate',
+            'One-on-One Meetings'
+        ],
+        'Value': [
+            f"{total_attendees:,.0f}",
+            f"{stats['avg_attendees']:.1f}",
+            f"{stats['max_attendees']:,.0f}",
+            f"{(stats['accepted'] / total_attendees * 100):.1f}%" if total_attendees > 0 else "N/A",
+            f"{(stats['declined'] / total_attendees * 100):.1f}%" if total_attendees > 0 else "N/A",
+            f"{stats['one_on_one']:,.0f} ({(stats['one_on_one'] / stats['total_meetings'] * 100):.1f}%)"
+        ]
+    })
+    return attendee_metrics
+
+def display_attendee_analysis(df, stats, query_key):
     """Display detailed attendee analysis"""
     if df.empty:
         return
     
     st.subheader("👥 Attendee Analysis")
     
+    figs = build_attendee_figs(df, query_key)
     col1, col2 = st.columns(2)
     
     with col1:
-        # Response rate analysis
-        if 'attendees_accepted' in df.columns and 'attendees_declined' in df.columns:
-            response_data = {
-                'Accepted': df['attendees_accepted'].sum(),
-                'Declined': df['attendees_declined'].sum(),
-                'Tentative': df['attendees_tentative'].sum() if 'attendees_tentative' in df.columns else 0,
-                'No Response': df['attendees_needs_action'].sum() if 'attendees_needs_action' in df.columns else 0
-            }
-            
-            # Only show chart if there's data
-            if sum(response_data.values()) > 0:
-                fig_response = px.pie(
-                    values=list(response_data.values()),
-                    names=list(response_data.keys()),
-                    title="Meeting Response Distribution",
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                st.plotly_chart(fig_response, use_container_width=True)
-            else:
-                st.info("No response data available")
+        if figs['response'] is not None:
+            st.plotly_chart(figs['response'], use_container_width=True)
+        elif 'attendees_accepted' in df.columns and 'attendees_declined' in df.columns:
+            st.info("No response data available")
         else:
             st.info("Attendee response data not available")
     
     with col2:
-        # Meeting size distribution
-        size_counts = df['meeting_size'].value_counts()
-        
-        fig_size = px.bar(
-            x=size_counts.values,
-            y=size_counts.index,
-            orientation='h',
-            title="Meeting Size Distribution",
-            labels={'x': 'Number of Meetings', 'y': 'Meeting Size'}
-        )
-        st.plotly_chart(fig_size, use_container_width=True)
+        st.plotly_chart(figs['size'], use_container_width=True)
     
     # Attendee metrics table
     st.subheader("📊 Attendee Metrics")
     
-    attendee_metrics = pd.DataFrame({
-        'Metric': [
-            'Total Attendees (all meetings)',
-            'Average Attendees per Meeting',
-            'Most Attendees in Single Meeting',
-            'Average Acceptance Rate',
-            'Average Decline Rate',
-            'One-on-One Meetings'
-        ],
-        'Value': [
-            f"{df['attendees_count'].sum():,}",
-            f"{df['attendees_count'].mean():.1f}",
-            f"{df['attendees_count'].max():,}",
-            f"{(df['attendees_accepted'].sum() / df['attendees_count'].sum() * 100):.1f}%" if df['attendees_count'].sum() > 0 else "N/A",
-            f"{(df['attendees_declined'].sum() / df['attendees_count'].sum() * 100):.1f}%" if df['attendees_count'].sum() > 0 else "N/A",
-            f"{df['is_one_on_one'].sum():,} ({(df['is_one_on_one'].sum() / len(df) * 100):.1f}%)"
-        ]
-    })
-    
+    attendee_metrics = build_attendee_metrics_table(stats)
     st.dataframe(attendee_metrics, use_container_width=True, hide_index=True)
 
-def display_time_analysis(df):
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def build_time_figs(_df, query_key):
+    """Build the time pattern charts, cached by the query that loaded the frame"""
+    df = _df
+    
+    # Meetings by day of week
+    day_counts = df['day_of_week'].value_counts(sort=True, dropna=True)
+    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    day_counts = day_counts.reindex(day_order, fill_value=0)
+    
+    fig_days = px.bar(
+        x=day_counts.index, 
+        y=day_counts.values,
+        title="Meetings by Day of Week",
+        labels={'x': 'Day', 'y': 'Number of Meetings'},
+        color=day_counts.values,
+        color_continuous_scale='blues'
+    )
+    
+    # Meetings by time of day
+    time_counts = df['time_of_day'].value_counts(sort=True, dropna=True)
+    
+    fig_time = px.pie(
+        values=time_counts.values,
+        names=time_counts.index,
+        title="Meetings by Time of Day",
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    
+    # Monthly trend
+    monthly_data = df.groupby('_month', observed=True).agg({
+        'duration_minutes': 'sum',
+        'attendees_count': 'sum',
+        'user_email': 'count'
+    }).reset_index()
+    
+    fig_trend = go.Figure()
+    fig_trend.add_trace(go.Scatter(
+        x=monthly_data['_month'],
+        y=monthly_data['user_email'],
+        mode='lines+markers',
+        name='Number of Meetings',
+        line=dict(color='blue')
+    ))
+    
+    fig_trend.update_layout(
+        title="Monthly Meeting Trend",
+        xaxis_title="Month",
+        yaxis_title="Number of Meetings"
+    )
+    
+    return {'days': fig_days, 'time_of_day': fig_time, 'trend': fig_trend}
+
+def display_time_analysis(df, query_key):
     """Display enhanced time-based analysis"""
     if df.empty:
         return
     
     st.subheader("📅 Time Patterns")
     
+    figs = build_time_figs(df, query_key)
     col1, col2 = st.columns(2)
     
     with col1:
-        # Meetings by day of week
-        day_counts = df['day_of_week'].value_counts()
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        day_counts = day_counts.reindex(day_order, fill_value=0)
-        
-        fig_days = px.bar(
-            x=day_counts.index, 
-            y=day_counts.values,
-            title="Meetings by Day of Week",
-            labels={'x': 'Day', 'y': 'Number of Meetings'},
-            color=day_counts.values,
-            color_continuous_scale='blues'
-        )
-        st.plotly_chart(fig_days, use_container_width=True)
+        st.plotly_chart(figs['days'], use_container_width=True)
     
     with col2:
-        # Meetings by time of day
-        time_counts = df['time_of_day'].value_counts()
-        
-        fig_time = px.pie(
-            values=time_counts.values,
-            names=time_counts.index,
-            title="Meetings by Time of Day",
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        st.plotly_chart(fig_time, use_container_width=True)
+        st.plotly_chart(figs['time_of_day'], use_container_width=True)
     
-    # Monthly trend
-    if len(df) > 0:
-        monthly_data = df.groupby([df['start'].dt.to_period('M')]).agg({
-            'duration_minutes': 'sum',
-            'attendees_count': 'sum',
-            'user_email': 'count'
-        }).reset_index()
-        monthly_data['start'] = monthly_data['start'].astype(str)
-        
-        fig_trend = go.Figure()
-        fig_trend.add_trace(go.Scatter(
-            x=monthly_data['start'],
-            y=monthly_data['user_email'],
-            mode='lines+markers',
-            name='Number of Meetings',
-            line=dict(color='blue')
+    st.plotly_chart(figs['trend'], use_container_width=True)
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def build_efficiency_figs(_df, query_key):
+    """Build the efficiency charts, cached by the query that loaded the frame"""
+    df = _df
+    
+    # Duration distribution, binned here so only 20 bars are sent to the browser
+    durations = df['duration_minutes'].dropna().to_numpy()
+    counts, edges = np.histogram(durations, bins=DURATION_BINS)
+    fig_duration = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        hovertemplate="%{x:.0f} min: %{y} meetings<extra></extra>"
+    ))
+    fig_duration.update_layout(
+        title="Meeting Duration Distribution",
+        xaxis_title="Duration (minutes)",
+        yaxis_title="Number of Meetings",
+        bargap=0
+    )
+    
+    # Efficiency scatter plot
+    # Filter out invalid efficiency scores for better visualization
+    efficiency = df['efficiency_score'].to_numpy()
+    plot_df = df[(efficiency > 0) & np.isfinite(efficiency)]
+    
+    if len(plot_df) > SCATTER_MAX_POINTS:
+        plot_df = plot_df.sort_values('duration_minutes')
+        keep = lttb_indices(
+            plot_df['duration_minutes'].to_numpy(dtype=np.float64),
+            plot_df['attendees_count'].to_numpy(dtype=np.float64),
+            SCATTER_MAX_POINTS
+        )
+        plot_df = plot_df.iloc[keep]
+    
+    fig_efficiency = None
+    if not plot_df.empty:
+        sizes = plot_df['efficiency_score'].to_numpy()
+        hover_text = plot_df['summary'].to_numpy(dtype=object, na_value=None) if 'summary' in plot_df.columns else None
+        # WebGL scatter keeps large selections responsive in the browser
+        fig_efficiency = go.Figure(go.Scattergl(
+            x=plot_df['duration_minutes'],
+            y=plot_df['attendees_count'],
+            mode='markers',
+            text=hover_text,
+            marker=dict(
+                size=sizes,
+                sizemode='area',
+                sizeref=2.0 * sizes.max() / (SCATTER_MAX_MARKER_SIZE ** 2),
+                sizemin=2
+            )
         ))
-        
-        fig_trend.update_layout(
-            title="Monthly Meeting Trend",
-            xaxis_title="Month",
-            yaxis_title="Number of Meetings"
+        fig_efficiency.update_layout(
+            title="Meeting Efficiency (Size = Attendees per Hour)",
+            xaxis_title="Duration (minutes)",
+            yaxis_title="Number of Attendees"
         )
-        
-        st.plotly_chart(fig_trend, use_container_width=True)
+    
+    return {'duration': fig_duration, 'efficiency': fig_efficiency}
 
-def display_efficiency_analysis(df):
+def display_efficiency_analysis(df, query_key):
     """Display meeting efficiency analysis"""
     if df.empty:
         return
@@ -307,38 +514,15 @@ def display_efficiency_analysis(df):
         st.warning("Duration data not available for efficiency analysis")
         return
     
+    figs = build_efficiency_figs(df, query_key)
     col1, col2 = st.columns(2)
     
     with col1:
-        # Duration distribution
-        fig_duration = px.histogram(
-            df,
-            x='duration_minutes',
-            nbins=20,
-            title="Meeting Duration Distribution",
-            labels={'duration_minutes': 'Duration (minutes)', 'count': 'Number of Meetings'}
-        )
-        st.plotly_chart(fig_duration, use_container_width=True)
+        st.plotly_chart(figs['duration'], use_container_width=True)
     
     with col2:
-        # Efficiency scatter plot
-        # Filter out invalid efficiency scores for better visualization
-        plot_df = df[df['efficiency_score'] > 0].copy()
-        
-        if not plot_df.empty:
-            fig_efficiency = px.scatter(
-                plot_df,
-                x='duration_minutes',
-                y='attendees_count',
-                size='efficiency_score',
-                title="Meeting Efficiency (Size = Attendees per Hour)",
-                labels={
-                    'duration_minutes': 'Duration (minutes)',
-                    'attendees_count': 'Number of Attendees'
-                },
-                hover_data=['summary'] if 'summary' in plot_df.columns else None
-            )
-            st.plotly_chart(fig_efficiency, use_container_width=True)
+        if figs['efficiency'] is not None:
+            st.plotly_chart(figs['efficiency'], use_container_width=True)
         else:
             st.info("No efficiency data available for visualization")
 
@@ -349,9 +533,6 @@ def display_detailed_meetings_table(df):
     
     st.subheader("📋 Detailed Meetings")
     
-    # Prepare detailed data
-    detailed_df = df.copy()
-    
     # Select and rename columns for display
     display_columns = {
         'summary': 'Meeting Title',
@@ -367,27 +548,28 @@ def display_detailed_meetings_table(df):
     }
     
     # Filter to available columns
-    available_columns = {k: v for k, v in display_columns.items() if k in detailed_df.columns}
+    available_columns = [col for col in display_columns if col in df.columns]
     
-    display_df = detailed_df[list(available_columns.keys())].copy()
-    display_df = display_df.rename(columns=available_columns)
+    # Pick the 50 most recent meetings before touching any other rows
+    display_df = df.nlargest(DETAIL_TABLE_ROWS, 'start')[available_columns].rename(columns=display_columns)
     
     # Format datetime
     if 'Start Time' in display_df.columns:
         display_df['Start Time'] = display_df['Start Time'].dt.strftime('%Y-%m-%d %H:%M')
     
-    # Sort by start time (most recent first)
-    display_df = display_df.sort_values('Start Time', ascending=False)
-    
-    # Display with pagination
+    # Hand Streamlit an Arrow table directly so it skips its own pandas conversion
     st.dataframe(
-        display_df.head(50),  # Show first 50 rows
+        pa.Table.from_pandas(display_df, preserve_index=False),
         use_container_width=True,
         hide_index=True
     )
     
-    if len(display_df) > 50:
-        st.info(f"Showing first 50 of {len(display_df)} meetings. Use filters to narrow down results.")
+    if len(df) > DETAIL_TABLE_ROWS:
+        st.info(f"Showing first {DETAIL_TABLE_ROWS} of {len(df)} meetings. Use filters to narrow down results.")
+
+def markdown_list(title, items):
+    """Render a bold title and bullet items as one markdown string, so each list is a single element"""
+    return f"**{title}**\n\n" + "\n".join(f"- {item}" for item in items)
 
 def display_attendee_insights(df):
     """Display insights about meeting attendees"""
@@ -401,25 +583,22 @@ def display_attendee_insights(df):
     with col1:
         # Most active organizers
         if 'user_email' in df.columns:
-            organizer_counts = df['user_email'].value_counts().head(10)
-            st.write("**Top Meeting Organizers**")
-            for email, count in organizer_counts.items():
-                st.write(f"• {email}: {count} meetings")
+            organizer_counts = df['user_email'].value_counts(sort=True, dropna=True).head(10)
+            st.markdown(markdown_list("Top Meeting Organizers",
+                                      (f"{email}: {count} meetings" for email, count in organizer_counts.items())))
     
     with col2:
         # Department participation
         if 'department' in df.columns and df['department'].notna().any():
-            dept_counts = df['department'].value_counts().head(10)
-            st.write("**Most Active Departments**")
-            for dept, count in dept_counts.items():
-                st.write(f"• {dept}: {count} meetings")
+            dept_counts = df['department'].value_counts(sort=True, dropna=True).head(10)
+            st.markdown(markdown_list("Most Active Departments",
+                                      (f"{dept}: {count} meetings" for dept, count in dept_counts.items())))
     
     with col3:
         # Meeting patterns
-        avg_duration_by_size = df.groupby('meeting_size')['duration_minutes'].mean().round(1)
-        st.write("**Avg Duration by Size**")
-        for size, duration in avg_duration_by_size.items():
-            st.write(f"• {size}: {duration}m")
+        avg_duration_by_size = mean_by_category(df['meeting_size'], df['duration_minutes']).round(1)
+        st.markdown(markdown_list("Avg Duration by Size",
+                                  (f"{size}: {duration}m" for size, duration in avg_duration_by_size.items())))
 
 def display_quick_stats():
     """Display quick stats from cached summary"""
@@ -475,18 +654,22 @@ def main():
     department = filters.get('department') if filters.get('department') != 'All' else None
     user_email = filters.get('user_email') if filters.get('user_email') != 'All' else None
     limit = filters.get('limit', 10000)
+    one_on_one_only = filters.get('one_on_one_only', False)
     
-    # Load data with filters
-    with st.spinner(f"Loading up to {limit:,} meetings..."):
-        df = load_meetings_data(start_date, end_date, department, user_email, limit)
+    # Load data with filters (all filters are applied in SQL)
+    try:
+        with st.spinner(f"Loading up to {limit:,} meetings..."):
+            df, loaded_at = load_meetings_data(start_date, end_date, department, user_email, limit,
+                                               one_on_one_only, meetings_cache_generation())
+    except Exception as e:
+        logger.error(f"Error loading data from Cloud SQL: {e}")
+        st.error(f"Error connecting to Cloud SQL database: {e}")
+        return
     
     if df.empty:
         st.error("No meeting data found. Please check your database connection or adjust filters.")
         return
     
-    # Apply additional filters
-    df = apply_filters(df, filters)
-    
     # Display data info
     if not df.empty:
         st.success(f"✅ Showing {len(df):,} meetings")
@@ -503,39 +686,45 @@ def main():
     if len(df) > 25000:
         st.warning("⚠️ Large dataset loaded. Some visualizations may be slow. Consider using more specific filters.")
     
+    # Summary scalars shared by the overview and attendee sections
+    # Tied to this particular load, so derived caches never describe a different frame
+    query_key = (start_date, end_date, department, user_email, limit, one_on_one_only, loaded_at)
+    stats = compute_meeting_stats(df, query_key)
+    
     # Display analysis sections
-    display_overview_metrics(df)
+    display_overview_metrics(df, stats)
     st.markdown("---")
     
-    display_attendee_analysis(df)
+    display_attendee_analysis(df, stats, query_key)
     st.markdown("---")
     
-    display_time_analysis(df)
-    st.markdown("---")
+    # Heavier sections start collapsed; their figures come from the cached builders
+    with st.expander("📅 Time Patterns", expanded=False):
+        display_time_analysis(df, query_key)
     
-    display_efficiency_analysis(df)
-    st.markdown("---")
+    with st.expander("⚡ Meeting Efficiency", expanded=False):
+        display_efficiency_analysis(df, query_key)
     
-    display_attendee_insights(df)
-    st.markdown("---")
+    with st.expander("🎯 Attendee Insights", expanded=False):
+        display_attendee_insights(df)
     
-    # Limit detailed table for performance
-    if len(df) <= 1000:
-        display_detailed_meetings_table(df)
-    else:
-        st.subheader("📋 Detailed Meetings")
-        st.info(f"Too many meetings ({len(df):,}) to display detailed table. Use filters to reduce the dataset to 1,000 or fewer meetings.")
-        
-        if st.button("Show Sample (First 100 rows)"):
-            display_detailed_meetings_table(df.head(100))
+    with st.expander("📋 Detailed Meetings", expanded=False):
+        # Limit detailed table for performance
+        if len(df) <= 1000:
+            display_detailed_meetings_table(df)
+        else:
+            st.subheader("📋 Detailed Meetings")
+            st.info(f"Too many meetings ({len(df):,}) to display detailed table. Use filters to reduce the dataset to 1,000 or fewer meetings.")
+            
+            if st.button("Show Sample (First 100 rows)"):
+                display_detailed_meetings_table(df.head(100))
     
     # Export functionality
     if st.button("📥 Export Filtered Data to CSV"):
         if len(df) <= 50000:
-            csv = df.to_csv(index=False)
             st.download_button(
                 label="Download CSV",
-                data=csv,
+                data=export_csv(df),
                 file_name=f"calendar_insights_{start_date}_{end_date}.csv",
                 mime="text/csv"
             )
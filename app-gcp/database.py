@@ -1,10 +1,23 @@
 import os
 import logging
+import numpy as np
 import pandas as pd
 import streamlit as st
 from contextlib import contextmanager
+from datetime import date
+import csv
+import functools
+import hashlib
 import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from psycopg2.extras import execute_values
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+import io
+import random
+import threading
 import time
+import weakref
 
 # Import production configuration
 try:
@@ -13,46 +26,117 @@ try:
 except ImportError:
     USING_PROD_CONFIG = False
 
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns save_meetings_data writes to the meetings table, in insert order
+MEETING_INSERT_COLUMNS = (
+    'user_email', 'department', 'division', 'subdepartment', 'is_manager',
+    'start_time', 'end_time', 'duration_minutes', 'attendees_count',
+    'attendees_accepted', 'attendees_declined', 'attendees_tentative',
+    'attendees_needs_action', 'attendees_accepted_emails', 'summary',
+    'meet_link', 'html_link', 'is_one_on_one', 'has_manager_attendee',
+    'unique_departments', 'departments_list'
+)
+
+# Email and meeting exclusions configuration
+EXCLUSIONS_PATH = 'config/email_exclusions.yaml'
+
+# Connections kept by the process-wide pool
+DB_POOL_MIN_CONNECTIONS = 2
+DB_POOL_MAX_CONNECTIONS = 10
+
+# Names of the statements prepared on each pooled connection (session-level, survive rollback)
+_PREPARED_STATEMENTS = weakref.WeakKeyDictionary()
+
+# Set once init_database has run in this process
+_SCHEMA_READY = False
+_SCHEMA_LOCK = threading.Lock()
+
+# Upper bound and random jitter (seconds) for the connection retry backoff
+RETRY_MAX_DELAY = 8
+RETRY_JITTER = 0.25
+
+# Connection error messages that retrying cannot fix (bad credentials, unknown database/role)
+NON_TRANSIENT_CONNECT_ERRORS = (
+    'password authentication failed',
+    'does not exist',
+    'no pg_hba.conf entry',
+)
+
+# Process-wide connection pool, created on first use
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# One slot per pooled connection; getconn raises instead of waiting when the pool is exhausted
+_POOL_SLOTS = threading.BoundedSemaphore(DB_POOL_MAX_CONNECTIONS)
+
+# Seconds to wait for a free pooled connection before giving up
+DB_POOL_ACQUIRE_TIMEOUT = 30
+
+# Integer meetings columns; kept integral when staged for COPY
+MEETING_INTEGER_COLUMNS = (
+    'duration_minutes', 'attendees_count', 'attendees_accepted', 'attendees_declined',
+    'attendees_tentative', 'attendees_needs_action', 'unique_departments'
+)
+
+# TEXT[] meetings columns; written as Postgres array literals when staged for COPY
+MEETING_ARRAY_COLUMNS = ('attendees_accepted_emails',)
+
+# Column defaults from the meetings schema, applied to missing values when saving
+MEETING_COLUMN_DEFAULTS = {
+    'is_manager': 'FALSE',
+    'attendees_count': '0',
+    'attendees_accepted': '0',
+    'attendees_declined': '0',
+    'attendees_tentative': '0',
+    'attendees_needs_action': '0',
+    'is_one_on_one': 'FALSE',
+    'has_manager_attendee': 'FALSE',
+    'unique_departments': '1',
+}
+
+def _pg_array_literal(values):
+    """Format a list of strings as a Postgres array literal; strings are assumed to be literals already"""
+    if isinstance(values, str):
+        return values
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for value in values)
+    return '{' + ','.join(f'"{value}"' for value in escaped) + '}'
+
+def _copy_text_escape(value):
+    """Escape a value for COPY text format, where a bare \\N means NULL; non-strings pass through"""
+    if not isinstance(value, str):
+        return value
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+@functools.lru_cache(maxsize=1)
+def _load_exclusions_cached(path, mtime):
+    """Parse the exclusions YAML; cached until the file's mtime changes"""
+    import yaml
+    with open(path, 'r') as f:
+        exclusions = yaml.safe_load(f)
+        
+    # Load exclusions (immutable, since the result is shared between callers)
+    return {
+        'individual_emails': frozenset(exclusions.get('individual_emails', [])),
+        'domain_patterns': tuple(exclusions.get('domain_patterns', [])),
+        'prefix_patterns': tuple(exclusions.get('prefix_patterns', [])),
+        'department_emails': frozenset(exclusions.get('department_emails', [])),
+        'meeting_keywords': frozenset(exclusions.get('meeting_keywords', []))
+    }
+
 def load_exclusions():
     """Load email and meeting exclusions from YAML configuration"""
     try:
-        import yaml
-        with open('config/email_exclusions.yaml', 'r') as f:
-            exclusions = yaml.safe_load(f)
-            
-        # Load exclusions
-        individual_emails = set(exclusions.get('individual_emails', []))
-        domain_patterns = exclusions.get('domain_patterns', [])
-        prefix_patterns = exclusions.get('prefix_patterns', [])
-        department_emails = set(exclusions.get('department_emails', []))
-        meeting_keywords = set(exclusions.get('meeting_keywords', []))
-        
-        return {
-            'individual_emails': individual_emails,
-            'domain_patterns': domain_patterns,
-            'prefix_patterns': prefix_patterns,
-            'department_emails': department_emails,
-            'meeting_keywords': meeting_keywords
-        }
+        mtime = os.stat(EXCLUSIONS_PATH).st_mtime
+        return _load_exclusions_cached(EXCLUSIONS_PATH, mtime)
     except Exception as e:
         logger.error(f"Error loading exclusions: {str(e)}")
         return {}
 
-@contextmanager
-def get_db_connection(max_retries=20, retry_delay=10):
-    """
-    Get a PostgreSQL database connection with retry logic for Cloud SQL
-    
-    Args:
-        max_retries: Maximum number of connection attempts
-        retry_delay: Delay between attempts in seconds
-    """
-    conn = None
-    retries = 0
-    
+def _connection_params():
+    """Read and validate the Cloud SQL connection parameters from the environment"""
     # Get Cloud SQL connection parameters from environment variables
     # All sensitive values must be provided via environment variables
     db_host = os.getenv('POSTGRES_HOST', os.getenv('DB_HOST'))
@@ -82,56 +166,137 @@ def get_db_connection(max_retries=20, retry_delay=10):
     if cloud_sql_connection:
         logger.info(f"  Cloud SQL Connection: {cloud_sql_connection}")
     
-    while retries < max_retries:
-        try:
-            logger.info(f"Connecting to Cloud SQL PostgreSQL (attempt {retries+1}/{max_retries})")
-            
-            # Check if we're using socket connection (Cloud Run) or IP connection
-            if db_host.startswith('/cloudsql/'):
-                logger.info(f"Using Cloud SQL socket connection: {db_host}")
-                conn = psycopg2.connect(
-                    host=db_host,
-                    database=db_name,
-                    user=db_user,
-                    password=db_password,
-                    connect_timeout=30
-                )
-            else:
-                logger.info(f"Using IP connection to {db_host}:{db_port}")
-                conn = psycopg2.connect(
-                    host=db_host,
-                    port=db_port,
-                    database=db_name,
-                    user=db_user,
-                    password=db_password,
-                    connect_timeout=30
-                )
-            
-            # Test the connection 
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT 1 as test")
-                result = cursor.fetchone()
-                
-            if result and result[0] == 1:
-                logger.info(f"Successfully connected to Cloud SQL PostgreSQL database: {db_name}")
-                break
-            else:
-                raise Exception("Connection test failed")
+    params = {
+        'host': db_host,
+        'database': db_name,
+        'user': db_user,
+        'password': db_password,
+        'connect_timeout': 30
+    }
+    
+    # Check if we're using socket connection (Cloud Run) or IP connection
+    if db_host.startswith('/cloudsql/'):
+        logger.info(f"Using Cloud SQL socket connection: {db_host}")
+    else:
+        logger.info(f"Using IP connection to {db_host}:{db_port}")
+        params['port'] = db_port
+    
+    return params
+
+def _is_transient_connect_error(error):
+    """Whether a failed connection attempt is worth retrying"""
+    if not isinstance(error, psycopg2.OperationalError):
+        return False
+    message = str(error)
+    return not any(fragment in message for fragment in NON_TRANSIENT_CONNECT_ERRORS)
+
+def _get_pool(max_retries, retry_delay):
+    """Return the process-wide connection pool, creating it with retry logic on first use"""
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+    
+    with _POOL_LOCK:
+        if _POOL is not None:
+            return _POOL
+        
+        params = _connection_params()
+        retries = 0
+        
+        while retries < max_retries:
+            pool = None
+            try:
+                logger.info(f"Connecting to Cloud SQL PostgreSQL (attempt {retries+1}/{max_retries})")
+                pool = ThreadedConnectionPool(DB_POOL_MIN_CONNECTIONS, DB_POOL_MAX_CONNECTIONS, **params)
                 
-        except Exception as e:
-            retries += 1
-            if retries >= max_retries:
-                logger.error(f"Failed to connect to Cloud SQL after {max_retries} attempts: {str(e)}")
-                raise
-            else:
-                logger.warning(f"Connection attempt {retries} failed: {str(e)}. Retrying in {retry_delay}s...")
-                time.sleep(retry_delay)
+                # Test the connection 
+                conn = pool.getconn()
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1 as test")
+                        result = cursor.fetchone()
+                    conn.rollback()
+                finally:
+                    pool.putconn(conn)
+                    
+                if result and result[0] == 1:
+                    logger.info(f"Successfully connected to Cloud SQL PostgreSQL database: {params['database']}")
+                    _POOL = pool
+                    break
+                else:
+                    raise psycopg2.OperationalError("Connection test failed")
+                    
+            except Exception as e:
+                if pool is not None:
+                    pool.closeall()
+                retries += 1
+                if not _is_transient_connect_error(e):
+                    logger.error(f"Failed to connect to Cloud SQL (not retrying): {str(e)}")
+                    raise
+                if retries >= max_retries:
+                    logger.error(f"Failed to connect to Cloud SQL after {max_retries} attempts: {str(e)}")
+                    raise
+                else:
+                    # Exponential backoff with jitter so restarting instances don't retry in lockstep
+                    delay = min(RETRY_MAX_DELAY, retry_delay * (2 ** (retries - 1))) + random.uniform(0, RETRY_JITTER)
+                    logger.warning(f"Connection attempt {retries} failed: {str(e)}. Retrying in {delay:.2f}s...")
+                    time.sleep(delay)
+    
+    return _POOL
+
+def _release_connection(pool, conn):
+    """Return a connection to the pool in a clean state, discarding it if it is broken, and free its slot"""
+    try:
+        if conn.closed:
+            pool.putconn(conn, close=True)
+            return
+        try:
+            # End any read transaction left open and undo per-caller session changes
+            conn.rollback()
+            if conn.autocommit:
+                conn.autocommit = False
+            pool.putconn(conn)
+        except psycopg2.Error:
+            pool.putconn(conn, close=True)
+    finally:
+        _POOL_SLOTS.release()
+
+@contextmanager
+def get_db_connection(max_retries=20, retry_delay=0.25):
+    """
+    Get a pooled PostgreSQL database connection for Cloud SQL
+    
+    Args:
+        max_retries: Maximum number of attempts when creating the pool
+        retry_delay: Initial delay between attempts in seconds, doubled after each failure
+    """
+    pool = _get_pool(max_retries, retry_delay)
+    # Wait for a free connection rather than letting getconn fail on an exhausted pool
+    if not _POOL_SLOTS.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT):
+        raise PoolError(f"No pooled connection became free within {DB_POOL_ACQUIRE_TIMEOUT}s")
+    try:
+        conn = pool.getconn()
+        # Drop connections the server has already closed
+        while conn.closed:
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+    except Exception:
+        _POOL_SLOTS.release()
+        raise
     
     try:
         yield conn
     finally:
-        if conn:
-            conn.close()
+        _release_connection(pool, conn)
+
+def prepared_query(conn, name, query):
+    """PREPARE a static query once per pooled connection and return the EXECUTE statement for it"""
+    prepared = _PREPARED_STATEMENTS.setdefault(conn, set())
+    if name not in prepared:
+        with conn.cursor() as cursor:
+            cursor.execute(f"PREPARE {name} AS {query}")
+        prepared.add(name)
+    return f"EXECUTE {name}"
 
 def init_database():
     """Initialize the PostgreSQL database with required tables"""
@@ -152,21 +317,21 @@ def init_database():
                     start_time TIMESTAMP NOT NULL,
                     end_time TIMESTAMP NOT NULL,
                     duration_minutes INTEGER,
-                    attendees_count INTEGER DEFAULT 0,
-                    attendees_accepted INTEGER DEFAULT 0,
-                    attendees_declined INTEGER DEFAULT 0,
-                    attendees_tentative INTEGER DEFAULT 0,
-                    attendees_needs_action INTEGER DEFAULT 0,
-                    attendees_accepted_emails TEXT,
+                    attendees_count SMALLINT DEFAULT 0,
+                    attendees_accepted SMALLINT DEFAULT 0,
+                    attendees_declined SMALLINT DEFAULT 0,
+                    attendees_tentative SMALLINT DEFAULT 0,
+                    attendees_needs_action SMALLINT DEFAULT 0,
+                    attendees_accepted_emails TEXT[],
                     summary TEXT,
                     meet_link TEXT,
                     html_link TEXT,
                     is_one_on_one BOOLEAN DEFAULT FALSE,
                     has_manager_attendee BOOLEAN DEFAULT FALSE,
-                    unique_departments INTEGER DEFAULT 1,
+                    unique_departments SMALLINT DEFAULT 1,
                     departments_list TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
+                ) WITH (fillfactor = 85)
             ''')
             
             # Create users table if it doesn't exist
@@ -184,9 +349,27 @@ def init_database():
             ''')
             
             # Create indexes for performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_user_email ON meetings(user_email)')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_meetings_user_time ON meetings(user_email, start_time DESC)
+                INCLUDE (duration_minutes, attendees_count, is_one_on_one)
+            ''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_start_time ON meetings(start_time)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_department ON meetings(department)')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_meetings_dept_time ON meetings(department, start_time DESC)
+                INCLUDE (duration_minutes)
+            ''')
+            # The GIN index needs the TEXT[] column; tables created before it stay TEXT until update_schema.py migrates them
+            cursor.execute("""
+                SELECT data_type 
+                FROM information_schema.columns 
+                WHERE table_name = 'meetings' 
+                AND column_name = 'attendees_accepted_emails'
+            """)
+            column = cursor.fetchone()
+            if column and column[0] == 'ARRAY':
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_accepted_emails_gin ON meetings USING GIN (attendees_accepted_emails)')
+            else:
+                logger.warning("attendees_accepted_emails is not an array column; run update_schema.py to migrate it and build its index")
             
             conn.commit()
             logger.info("PostgreSQL database initialization complete")
@@ -203,6 +386,16 @@ def init_database():
         logger.error(f"Error initializing PostgreSQL database: {str(e)}")
         raise
 
+def ensure_schema():
+    """Run init_database once per process; later calls return immediately"""
+    global _SCHEMA_READY
+    if _SCHEMA_READY:
+        return
+    with _SCHEMA_LOCK:
+        if not _SCHEMA_READY:
+            init_database()
+            _SCHEMA_READY = True
+
 def add_sample_data(conn):
     """Add sample data to the PostgreSQL database"""
     try:
@@ -217,9 +410,9 @@ def add_sample_data(conn):
             ('charlie.davis@company.com', 'Sales', 'Sales & Marketing', 'Enterprise', True),
         ]
         
-        cursor.executemany('''
+        execute_values(cursor, '''
             INSERT INTO users (email, department, division, subdepartment, is_manager)
-            VALUES (%s, %s, %s, %s, %s)
+            VALUES %s
             ON CONFLICT (email) DO NOTHING
         ''', sample_users)
         
@@ -247,7 +440,7 @@ def add_sample_data(conn):
                 i % 2,        # attendees_declined
                 i % 3,        # attendees_tentative
                 i % 2,        # attendees_needs_action
-                f'participant{i}@company.com',  # attendees_accepted_emails
+                [f'participant{i}@company.com'],  # attendees_accepted_emails
                 f'Sample Meeting {i + 1}',     # summary
                 f'https://meet.google.com/abc-def-{i:03d}',  # meet_link
                 f'https://calendar.google.com/event?eid={i}',  # html_link
@@ -258,16 +451,12 @@ def add_sample_data(conn):
             )
             sample_meetings.append(meeting)
         
-        cursor.executemany('''
-            INSERT INTO meetings (
-                user_email, department, division, subdepartment, is_manager,
-                start_time, end_time, duration_minutes, attendees_count,
-                attendees_accepted, attendees_declined, attendees_tentative,
-                attendees_needs_action, attendees_accepted_emails, summary,
-                meet_link, html_link, is_one_on_one, has_manager_attendee,
-                unique_departments, departments_list
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ''', sample_meetings)
+        execute_values(
+            cursor,
+            f"INSERT INTO meetings ({', '.join(MEETING_INSERT_COLUMNS)}) VALUES %s",
+            sample_meetings,
+            page_size=500
+        )
         
         conn.commit()
         logger.info(f"Added {len(sample_users)} sample users and {len(sample_meetings)} sample meetings")
@@ -275,106 +464,320 @@ def add_sample_data(conn):
     except Exception as e:
         logger.error(f"Error adding sample data: {str(e)}")
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def get_meetings_data(start_date=None, end_date=None, department=None, user_email=None, limit=10000):
-    """
-    Retrieve meetings data from the PostgreSQL database with optimizations
-    """
-    try:
-        # Initialize database if needed
-        init_database()
-        
-        with get_db_connection() as conn:
-            # Build dynamic WHERE conditions
-            where_conditions = ["1=1"]
-            params = {}
-            
-            # Default to last 30 days instead of 1 year for better performance
-            if not start_date and not end_date:
-                where_conditions.append("start_time >= (CURRENT_DATE - INTERVAL '30 days')")
-            else:
-                if start_date:
-                    where_conditions.append("start_time >= %(start_date)s")
-                    params['start_date'] = start_date
-                if end_date:
-                    where_conditions.append("start_time <= %(end_date)s")
-                    params['end_date'] = end_date
-            
-            if department:
-                where_conditions.append("department = %(department)s")
-                params['department'] = department
-                
-            if user_email:
-                where_conditions.append("user_email = %(user_email)s")
-                params['user_email'] = user_email
-            
-            # Optimized query with only essential columns
-            query = f"""
-            SELECT
-                user_email,
-                department,
-                division,
-                is_manager, 
-                start_time as start,      
-                end_time as "end",      
-                duration_minutes,
-                attendees_count,
-                attendees_accepted,
-                attendees_declined,
-                attendees_tentative,
-                summary,
-                meet_link,
-                CASE 
+# Labels indexed by month (0 = January)
+MONTH_NAMES = np.array(['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                        'August', 'September', 'October', 'November', 'December'], dtype=object)
+
+# Time of day buckets: hours up to and including each edge, then the evening remainder
+TIME_OF_DAY_EDGES = np.array([9, 12, 17])
+TIME_OF_DAY_LABELS = ['Early (0-9)', 'Morning (9-12)', 'Afternoon (12-17)', 'Evening (17-24)']
+
+def add_derived_columns(df):
+    """Add the date/month/week/year breakdown and time of day to a frame that has start and hour"""
+    start = df['start'].to_numpy(dtype='datetime64[ns]')
+    days = start.astype('datetime64[D]')
+    hours = df['hour'].to_numpy()
+    months = start.astype('datetime64[M]').astype(np.int64)
+    
+    df['date'] = days.astype(object)
+    df['month'] = MONTH_NAMES[months % 12]
+    df['week'] = df['start'].dt.isocalendar().week
+    df['year'] = months // 12 + 1970
+    
+    # Time of day categories (right-closed buckets, as pd.cut produced)
+    df['time_of_day'] = pd.Categorical.from_codes(
+        np.searchsorted(TIME_OF_DAY_EDGES, hours, side='left'),
+        categories=TIME_OF_DAY_LABELS,
+        ordered=True
+    )
+    return df
+
+# SELECT expressions for each column get_meetings_data can return, in output order
+MEETINGS_SELECT_COLUMNS = {
+    'user_email': 'user_email',
+    'department': 'department',
+    'division': 'division',
+    'is_manager': 'is_manager',
+    'start': 'start_time as start',
+    'end': 'end_time as "end"',
+    'duration_minutes': 'duration_minutes',
+    'attendees_count': 'attendees_count',
+    'attendees_accepted': 'attendees_accepted',
+    'attendees_declined': 'attendees_declined',
+    'attendees_tentative': 'attendees_tentative',
+    'summary': 'summary',
+    'meet_link': 'meet_link',
+    'meeting_size': """CASE 
                     WHEN attendees_count <= 2 THEN '1-on-1'
                     WHEN attendees_count <= 5 THEN 'Small (3-5)'
                     WHEN attendees_count <= 10 THEN 'Medium (6-10)'
                     WHEN attendees_count <= 20 THEN 'Large (11-20)'
                     ELSE 'Very Large (20+)'
-                END as meeting_size,
-                is_one_on_one
-            FROM meetings
-            WHERE {' AND '.join(where_conditions)}
-            ORDER BY start_time DESC
-            LIMIT %(limit)s
-            """
-            
-            params['limit'] = limit
-            
-            df = pd.read_sql_query(query, conn, params=params, parse_dates=['start', 'end'])
-            
-            if not df.empty:
-                # Add essential computed columns only
-                df['date'] = df['start'].dt.date
-                df['hour'] = df['start'].dt.hour
-                df['day_of_week'] = df['start'].dt.day_name()
-                df['month'] = df['start'].dt.month_name()
-                df['week'] = df['start'].dt.isocalendar().week
-                df['year'] = df['start'].dt.year
-                
-                # Time of day categories
-                df['time_of_day'] = pd.cut(
-                    df['hour'],
-                    bins=[0, 9, 12, 17, 24],
-                    labels=['Early (0-9)', 'Morning (9-12)', 'Afternoon (12-17)', 'Evening (17-24)'],
-                    include_lowest=True
-                )
-                
-                # Meeting efficiency score (participants per hour)
-                df['efficiency_score'] = df['attendees_count'] / (df['duration_minutes'] / 60)
-                df['efficiency_score'] = df['efficiency_score'].fillna(0)
-            
-            logger.info(f"Successfully retrieved {len(df)} meetings from Cloud SQL database")
+                END as meeting_size""",
+    'is_one_on_one': 'is_one_on_one',
+}
+
+# Derived columns selected alongside the full column set (not with a column subset)
+MEETINGS_DERIVED_COLUMNS = {
+    'hour': 'EXTRACT(HOUR FROM start_time)::int AS hour',
+    'day_of_week': "to_char(start_time, 'FMDay') AS day_of_week",
+    # Meeting efficiency score (participants per hour), 0 when the duration is missing or zero
+    'efficiency_score': """CASE WHEN duration_minutes > 0
+                    THEN COALESCE(attendees_count, 0) * 60.0 / duration_minutes
+                    ELSE 0
+                END::float8 AS efficiency_score""",
+}
+
+# Text columns get_meetings_data can return; never type-inferred when parsing COPY output
+MEETINGS_TEXT_COLUMNS = ('user_email', 'department', 'division', 'summary', 'meet_link',
+                         'meeting_size', 'day_of_week')
+
+def read_query_via_copy(conn, query, params, date_columns):
+    """Run a SELECT through COPY ... TO STDOUT and parse the CSV stream with pyarrow"""
+    buffer = io.BytesIO()
+    with conn.cursor() as cursor:
+        sql = cursor.mogrify(query, params).decode()
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", buffer)
+    buffer.seek(0)
+    
+    column_types = {col: pa.string() for col in MEETINGS_TEXT_COLUMNS}
+    column_types.update({col: pa.timestamp('ns') for col in date_columns})
+    column_types['efficiency_score'] = pa.float64()
+    convert_options = pa_csv.ConvertOptions(
+        column_types=column_types,
+        # COPY writes NULL as an unquoted empty field and booleans as t/f
+        null_values=[''],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+        true_values=['t'],
+        false_values=['f']
+    )
+    # Free-text columns such as summary can contain newlines, which COPY keeps inside quotes
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    return pa_csv.read_csv(buffer, parse_options=parse_options, convert_options=convert_options).to_pandas()
+
+# Low-cardinality text columns returned as categoricals
+MEETINGS_CATEGORY_COLUMNS = ('department', 'division', 'day_of_week', 'meeting_size')
+
+# Seconds a meetings result stays valid, in memory and on disk
+MEETINGS_CACHE_TTL = 600
+
+# Parquet copies of meetings results, shared across sessions and reused after a restart.
+# They hold attendee emails and meeting titles, so the directory and files are private to the app user
+MEETINGS_CACHE_DIR = os.getenv('MEETINGS_CACHE_DIR', '/tmp/calendar-insights-cache')
+
+# Rewritten whenever meetings change, by any process; its token is part of every cache key
+MEETINGS_CACHE_GENERATION_FILE = os.path.join(MEETINGS_CACHE_DIR, 'generation')
+
+# Bump when the meetings query or derived columns change, so older cache files are ignored
+MEETINGS_SCHEMA_VERSION = 1
+
+def _meetings_cache_dir_ready():
+    """Create the cache directory private to this user; False when it cannot be used safely"""
+    try:
+        os.makedirs(MEETINGS_CACHE_DIR, mode=0o700, exist_ok=True)
+        info = os.stat(MEETINGS_CACHE_DIR)
+        if info.st_uid != os.getuid():
+            logger.warning(f"Not using meetings cache {MEETINGS_CACHE_DIR}: owned by another user")
+            return False
+        if info.st_mode & 0o077:
+            os.chmod(MEETINGS_CACHE_DIR, 0o700)
+        return True
+    except Exception as e:
+        logger.warning(f"Meetings cache {MEETINGS_CACHE_DIR} unavailable: {str(e)}")
+        return False
+
+def _write_private_file(path, write):
+    """Create path readable only by this user, writing under a temporary name so readers never see a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def meetings_cache_generation():
+    """Token of the last meetings change, empty before the first one"""
+    try:
+        with open(MEETINGS_CACHE_GENERATION_FILE) as f:
+            return f.read()
+    except OSError:
+        return ''
+
+def _meetings_cache_path(key):
+    """Parquet file holding the meetings result for a cache key"""
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+    return os.path.join(MEETINGS_CACHE_DIR, f"meetings_{digest}.parquet")
+
+def _read_meetings_cache(path):
+    """Load a cached meetings result, or None when it is missing or older than MEETINGS_CACHE_TTL"""
+    try:
+        if time.time() - os.path.getmtime(path) > MEETINGS_CACHE_TTL:
+            return None
+        return pd.read_parquet(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable meetings cache {path}: {str(e)}")
+        return None
+
+def _write_meetings_cache(path, df):
+    """Write a meetings result to the disk cache; failures only cost the next cold start"""
+    try:
+        _write_private_file(path, lambda f: df.to_parquet(f, index=False))
+    except Exception as e:
+        logger.warning(f"Could not write meetings cache {path}: {str(e)}")
+
+def clear_meetings_cache():
+    """
+    Drop cached meetings results after the meetings table changes. Other processes
+    see the new generation token and stop using their in-memory results too.
+    """
+    _fetch_meetings_data.clear()
+    if not _meetings_cache_dir_ready():
+        return
+    try:
+        _write_private_file(MEETINGS_CACHE_GENERATION_FILE, lambda f: f.write(os.urandom(8).hex().encode()))
+        for name in os.listdir(MEETINGS_CACHE_DIR):
+            if name.startswith('meetings_') and name.endswith('.parquet'):
+                os.remove(os.path.join(MEETINGS_CACHE_DIR, name))
+    except Exception as e:
+        logger.warning(f"Could not clear meetings cache: {str(e)}")
+
+@st.cache_resource(ttl=MEETINGS_CACHE_TTL, show_spinner=False)
+def _fetch_meetings_data(start_date, end_date, department, user_email, limit, columns, one_on_one_only,
+                         default_window_start, generation, schema_version):
+    """
+    Run the meetings query, reusing a fresh parquet copy from an earlier process when there is one.
+    Shared between sessions, so callers must not modify the returned frame; errors propagate
+    so that failed queries are not cached.
+    """
+    cache_path = None
+    if _meetings_cache_dir_ready():
+        cache_path = _meetings_cache_path((start_date, end_date, department, user_email, limit, columns,
+                                           one_on_one_only, default_window_start, generation, schema_version))
+        df = _read_meetings_cache(cache_path)
+        if df is not None:
+            logger.info(f"Loaded {len(df)} meetings from disk cache")
             return df
-            
+    
+    selected_columns = list(columns) if columns else list(MEETINGS_SELECT_COLUMNS)
+    
+    # Initialize database once per process
+    ensure_schema()
+    
+    with get_db_connection() as conn:
+        # Build dynamic WHERE conditions
+        where_conditions = ["1=1"]
+        params = {}
+        
+        # Default to last 30 days instead of 1 year for better performance
+        if not start_date and not end_date:
+            where_conditions.append("start_time >= (CURRENT_DATE - INTERVAL '30 days')")
+        else:
+            if start_date:
+                where_conditions.append("start_time >= %(start_date)s")
+                params['start_date'] = start_date
+            if end_date:
+                # Half-open bound so the whole end date is included
+                where_conditions.append("start_time < %(end_date)s::date + 1")
+                params['end_date'] = end_date
+        
+        if department:
+            where_conditions.append("department = %(department)s")
+            params['department'] = department
+        
+        if user_email:
+            where_conditions.append("user_email = %(user_email)s")
+            params['user_email'] = user_email
+        
+        if one_on_one_only:
+            where_conditions.append("is_one_on_one = TRUE")
+        
+        # Optimized query with only the requested columns
+        select_expressions = [MEETINGS_SELECT_COLUMNS[col] for col in selected_columns]
+        if not columns:
+            # Per-row derived columns computed by Postgres alongside the base columns
+            select_expressions.extend(MEETINGS_DERIVED_COLUMNS.values())
+        select_list = ",\n                ".join(select_expressions)
+        query = f"""
+        SELECT
+            {select_list}
+        FROM meetings
+        WHERE {' AND '.join(where_conditions)}
+        ORDER BY start_time DESC
+        LIMIT %(limit)s
+        """
+        
+        params['limit'] = limit
+        
+        date_columns = [col for col in ('start', 'end') if col in selected_columns]
+        df = read_query_via_copy(conn, query, params, date_columns)
+        
+        # Repeated short strings are far smaller and faster to group as categoricals
+        for col in MEETINGS_CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        if not df.empty and not columns:
+            # Add essential computed columns only
+            add_derived_columns(df)
+        
+        logger.info(f"Successfully retrieved {len(df)} meetings from Cloud SQL database")
+    
+    if cache_path:
+        _write_meetings_cache(cache_path, df)
+    return df
+
+def _selected_meetings_columns(columns):
+    """Validate a requested column subset and return the columns to select"""
+    selected_columns = list(columns) if columns else list(MEETINGS_SELECT_COLUMNS)
+    unknown_columns = [col for col in selected_columns if col not in MEETINGS_SELECT_COLUMNS]
+    if unknown_columns:
+        raise ValueError(f"Unknown meetings columns requested: {unknown_columns}")
+    return selected_columns
+
+def fetch_meetings_data(start_date=None, end_date=None, department=None, user_email=None, limit=10000,
+                        columns=None, one_on_one_only=False):
+    """
+    Same as get_meetings_data, but database errors are raised instead of returning an empty frame,
+    for callers that cache the result themselves
+    """
+    _selected_meetings_columns(columns)
+    
+    # The default 30-day window moves with the date, so it is part of the cache key
+    default_window_start = None if (start_date or end_date) else date.today()
+    
+    df = _fetch_meetings_data(start_date, end_date, department, user_email, limit,
+                              tuple(columns) if columns else None, one_on_one_only,
+                              default_window_start, meetings_cache_generation(), MEETINGS_SCHEMA_VERSION)
+    # Callers add and convert columns, so each gets its own copy of the shared frame
+    return df.copy()
+
+def get_meetings_data(start_date=None, end_date=None, department=None, user_email=None, limit=10000, columns=None,
+                      one_on_one_only=False):
+    """
+    Retrieve meetings data from the PostgreSQL database with optimizations
+    
+    Args:
+        columns: Optional subset of MEETINGS_SELECT_COLUMNS to fetch. When given,
+            only those columns are selected and the derived dashboard columns
+            (date, hour, day_of_week, ...) are not added.
+        one_on_one_only: Only return meetings flagged as 1-on-1.
+    """
+    selected_columns = _selected_meetings_columns(columns)
+    
+    try:
+        return fetch_meetings_data(start_date, end_date, department, user_email, limit, columns, one_on_one_only)
+        
     except Exception as e:
         logger.error(f"Error retrieving meetings data: {str(e)}")
         # Return empty DataFrame with expected columns if error occurs
-        return pd.DataFrame(columns=[
-            'user_email', 'department', 'division', 'is_manager',
-            'start', 'end', 'duration_minutes', 'attendees_count', 'attendees_accepted',
-            'attendees_declined', 'attendees_tentative', 'summary', 'meet_link',
-            'meeting_size', 'is_one_on_one'
-        ])
+        return pd.DataFrame(columns=selected_columns)
 
 @st.cache_data(ttl=3600)  # Cache for 1 hour - this changes infrequently
 def get_filter_options():
@@ -385,8 +788,9 @@ def get_filter_options():
         with get_db_connection() as conn:
             # Get departments
             dept_query = "SELECT DISTINCT department FROM meetings WHERE department IS NOT NULL ORDER BY department"
-            dept_df = pd.read_sql_query(dept_query, conn)
-            departments = dept_df['department'].tolist()
+            with conn.cursor() as cursor:
+                cursor.execute(prepared_query(conn, 'filter_departments', dept_query))
+                departments = [row[0] for row in cursor]
             
             # Get users (limit to recent active users)
             user_query = """
@@ -397,8 +801,9 @@ def get_filter_options():
             ORDER BY user_email 
             LIMIT 1000
             """
-            user_df = pd.read_sql_query(user_query, conn)
-            users = user_df['user_email'].tolist()
+            with conn.cursor() as cursor:
+                cursor.execute(prepared_query(conn, 'filter_users', user_query))
+                users = [row[0] for row in cursor]
             
             return departments, users
             
@@ -418,21 +823,74 @@ def get_summary_stats():
                 COUNT(*) as total_meetings,
                 COUNT(DISTINCT user_email) as total_users,
                 COUNT(DISTINCT department) as total_departments,
-                AVG(duration_minutes) as avg_duration,
-                AVG(attendees_count) as avg_attendees,
+                COALESCE(AVG(duration_minutes), 0)::float8 as avg_duration,
+                COALESCE(AVG(attendees_count), 0)::float8 as avg_attendees,
                 MIN(start_time) as earliest_meeting,
                 MAX(start_time) as latest_meeting
             FROM meetings
             WHERE start_time >= (CURRENT_DATE - INTERVAL '30 days')
             """
             
-            stats_df = pd.read_sql_query(query, conn, parse_dates=['earliest_meeting', 'latest_meeting'])
-            return stats_df.iloc[0].to_dict()
+            with conn.cursor() as cursor:
+                cursor.execute(prepared_query(conn, 'summary_stats', query))
+                row = cursor.fetchone()
+                return dict(zip([desc.name for desc in cursor.description], row))
             
     except Exception as e:
         logger.error(f"Error getting summary stats: {str(e)}")
         return {}
 
+@st.cache_data(ttl=600)  # Cache for 10 minutes
+def get_summary_buckets(start_date=None, end_date=None, department=None):
+    """
+    Get per-department meeting aggregates computed in the database
+    """
+    try:
+        with get_db_connection() as conn:
+            where_conditions = ["department IS NOT NULL"]
+            params = {}
+            
+            # Same default window as get_meetings_data
+            if not start_date and not end_date:
+                where_conditions.append("start_time >= (CURRENT_DATE - INTERVAL '30 days')")
+            else:
+                if start_date:
+                    where_conditions.append("start_time >= %(start_date)s")
+                    params['start_date'] = start_date
+                if end_date:
+                    # Half-open bound so the whole end date is included
+                    where_conditions.append("start_time < %(end_date)s::date + 1")
+                    params['end_date'] = end_date
+            
+            if department:
+                where_conditions.append("department = %(department)s")
+                params['department'] = department
+            
+            query = f"""
+            SELECT
+                department,
+                COUNT(*) as meetings,
+                AVG(duration_minutes)::float8 as avg_duration,
+                AVG(attendees_count)::float8 as avg_attendees,
+                SUM(CASE WHEN duration_minutes < 30 THEN 1 ELSE 0 END) as short_meetings,
+                SUM(CASE WHEN duration_minutes BETWEEN 30 AND 60 THEN 1 ELSE 0 END) as medium_meetings,
+                SUM(CASE WHEN duration_minutes > 60 THEN 1 ELSE 0 END) as long_meetings,
+                SUM(CASE WHEN is_one_on_one THEN 1 ELSE 0 END) as one_on_one
+            FROM meetings
+            WHERE {' AND '.join(where_conditions)}
+            GROUP BY department
+            ORDER BY meetings DESC
+            """
+            
+            return pd.read_sql_query(query, conn, params=params)
+            
+    except Exception as e:
+        logger.error(f"Error getting summary buckets: {str(e)}")
+        return pd.DataFrame(columns=[
+            'department', 'meetings', 'avg_duration', 'avg_attendees',
+            'short_meetings', 'medium_meetings', 'long_meetings', 'one_on_one'
+        ])
+
 def save_meetings_data(meetings_df):
     """
     Save meetings data to the PostgreSQL database
@@ -442,30 +900,51 @@ def save_meetings_data(meetings_df):
         return
         
     try:
+        columns = [col for col in MEETING_INSERT_COLUMNS if col in meetings_df.columns]
+        ignored = [col for col in meetings_df.columns if col not in MEETING_INSERT_COLUMNS]
+        if ignored:
+            logger.warning(f"Ignoring columns not stored in meetings: {ignored}")
+        
+        # Stage the rows in COPY text format, with integer columns kept integral and arrays in Postgres literal form
+        frame = meetings_df[columns].copy()
+        for col in MEETING_INTEGER_COLUMNS:
+            if col in frame.columns:
+                frame[col] = pd.to_numeric(frame[col]).round().astype('Int64')
+        for col in MEETING_ARRAY_COLUMNS:
+            if col in frame.columns:
+                frame[col] = frame[col].map(_pg_array_literal, na_action='ignore')
+        for col in frame.columns:
+            if not (pd.api.types.is_numeric_dtype(frame[col]) or pd.api.types.is_datetime64_any_dtype(frame[col])):
+                frame[col] = frame[col].map(_copy_text_escape, na_action='ignore')
+        
+        buffer = io.StringIO()
+        frame.to_csv(buffer, sep='\t', index=False, header=False, na_rep='\\N', quoting=csv.QUOTE_NONE)
+        buffer.seek(0)
+        column_list = ', '.join(columns)
+        # Missing values take the column default, as they would if the column were left out of the INSERT
+        select_list = ', '.join(
+            f"COALESCE({col}, {MEETING_COLUMN_DEFAULTS[col]})" if col in MEETING_COLUMN_DEFAULTS else col
+            for col in columns
+        )
+        
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            inserted = 0
             
-            for _, meeting in meetings_df.iterrows():
-                # Build dynamic insert with only available columns
-                columns = []
-                values = []
-                params = []
-                
-                for col in meeting.index:
-                    if pd.notna(meeting[col]):
-                        columns.append(col)
-                        values.append("%s")
-                        params.append(meeting[col])
-                
-                # Create and execute SQL statement
-                sql = f"INSERT INTO meetings ({', '.join(columns)}) VALUES ({', '.join(values)})"
-                cursor.execute(sql, params)
-                inserted += 1
+            # COPY into an unindexed temp table holding only the staged columns, then move
+            # everything with one INSERT ... SELECT (id and created_at take their defaults there)
+            cursor.execute(
+                f"CREATE TEMP TABLE tmp_meetings ON COMMIT DROP AS SELECT {column_list} FROM meetings WITH NO DATA"
+            )
+            cursor.copy_expert(f"COPY tmp_meetings ({column_list}) FROM STDIN", buffer)
+            cursor.execute(f"INSERT INTO meetings ({column_list}) SELECT {select_list} FROM tmp_meetings")
+            saved = cursor.rowcount
             
             # Commit transaction
             conn.commit()
-            logger.info(f"Successfully saved {inserted} meetings to Cloud SQL database")
+            logger.info(f"Successfully saved {saved} meetings to Cloud SQL database")
+        
+        # New rows make every cached meetings result stale
+        clear_meetings_cache()
             
     except Exception as e:
         logger.error(f"Error saving meetings data: {str(e)}")
@@ -488,10 +967,18 @@ def get_user_data():
             WHERE user_email IS NOT NULL
             ORDER BY user_email
             """
-            df = pd.read_sql_query(query, conn)
-            
-            # Convert to dictionary for easy lookup
-            user_dict = df.set_index('user_email').to_dict('index')
+            # Build the lookup dictionary straight from the cursor rows
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+                user_dict = {
+                    user_email: {
+                        'division': division,
+                        'department': department,
+                        'subdepartment': subdepartment,
+                        'is_manager': is_manager
+                    }
+                    for user_email, division, department, subdepartment, is_manager in cursor
+                }
             logger.info(f"Retrieved data for {len(user_dict)} users from Cloud SQL")
             return user_dict
             
@@ -499,6 +986,9 @@ def get_user_data():
         logger.error(f"Error loading user data: {str(e)}")
         return {}
 
+# Rows fetched per round trip by server-side scans
+SCAN_BATCH_SIZE = 5000
+
 def get_meetings_filtered(start_date=None, end_date=None, department=None, user_email=None):
     """
     Get filtered meetings data from the PostgreSQL database
@@ -514,7 +1004,8 @@ def get_meetings_filtered(start_date=None, end_date=None, department=None, user_
                 params['start_date'] = start_date
                 
             if end_date:
-                where_conditions.append("start_time <= %(end_date)s")
+                # Half-open bound so the whole end date is included
+                where_conditions.append("start_time < %(end_date)s::date + 1")
                 params['end_date'] = end_date
                 
             if department:
@@ -532,7 +1023,18 @@ def get_meetings_filtered(start_date=None, end_date=None, department=None, user_
             ORDER BY start_time DESC
             """
             
-            df = pd.read_sql_query(query, conn, params=params, parse_dates=['start_time', 'end_time'])
+            # Server-side cursor streams the unbounded scan in batches instead of buffering it all
+            chunks = []
+            with conn.cursor(name='meetings_scan') as cursor:
+                cursor.itersize = SCAN_BATCH_SIZE
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(SCAN_BATCH_SIZE)
+                    if not rows:
+                        break
+                    chunks.append(pd.DataFrame(rows, columns=[desc.name for desc in cursor.description]))
+            
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
             logger.info(f"Retrieved {len(df)} filtered meetings from Cloud SQL")
             return df
             
@@ -547,13 +1049,12 @@ def check_db_health():
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT COUNT(*) FROM meetings")
-                result = cursor.fetchone()
-                meeting_count = result[0] if result else 0
-                
-                cursor.execute("SELECT COUNT(DISTINCT user_email) FROM meetings")
+                # Both counts in one pass over meetings
+                cursor.execute(prepared_query(
+                    conn, 'health_counts', "SELECT COUNT(*), COUNT(DISTINCT user_email) FROM meetings"
+                ))
                 result = cursor.fetchone()
-                user_count = result[0] if result else 0
+                meeting_count, user_count = result if result else (0, 0)
                 
             logger.info(f"Cloud SQL health check passed. Found {meeting_count} meetings for {user_count} users.")
             return True, {'meetings': meeting_count, 'users': user_count}
@@ -5,6 +5,7 @@ Usage:
   python dynamic_fetch.py --years 3     # Fetch 3 years of historical data
   python dynamic_fetch.py --daily       # Fetch yesterday's data (for cron)
   python dynamic_fetch.py --days 30     # Fetch last 30 days
+  python dynamic_fetch.py --sync        # Fetch only events changed since the last sync
 """
 
 import os
@@ -13,12 +14,15 @@ import logging
 import argparse
 from datetime import datetime, timedelta, timezone
 import time
+from operator import attrgetter
+
+from psycopg2.extras import execute_values
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from calendar_service import GoogleCalendarService
-from database import get_db_connection
+from database import get_db_connection, clear_meetings_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -113,9 +117,140 @@ def fetch_incremental_data(days_back=1):
         logger.error(f"Error fetching incremental data: {e}")
         return False
 
+def fetch_date_range(start_date, end_date):
+    """Fetch calendar data between two YYYY-MM-DD dates"""
+    try:
+        service = GoogleCalendarService()
+        
+        if not service.authenticate():
+            logger.error("Failed to authenticate with Google Calendar")
+            return False
+        
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(tzinfo=timezone.utc) + timedelta(days=1)
+        
+        meetings_data = service.fetch_calendar_data(start_dt, end_dt)
+        
+        if not meetings_data:
+            print("📭 No calendar data found")
+            return True
+        
+        print(f"✅ Found {len(meetings_data)} events")
+        return store_meetings_data(meetings_data, clear_existing=False, operation="range")
+        
+    except Exception as e:
+        logger.error(f"Error fetching date range: {e}")
+        return False
+
+def fetch_sync_data(calendar_id='primary', days_back=30):
+    """Fetch only events changed since the last run using Calendar API sync tokens"""
+    try:
+        service = GoogleCalendarService()
+        
+        if not service.authenticate():
+            logger.error("Failed to authenticate with Google Calendar")
+            return False
+        
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS calendar_sync_state (
+                    calendar_id TEXT PRIMARY KEY,
+                    sync_token TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("SELECT sync_token FROM calendar_sync_state WHERE calendar_id = %s", (calendar_id,))
+            row = cursor.fetchone()
+            conn.commit()
+        
+        sync_token = row[0] if row else None
+        if sync_token:
+            print(f"🔄 SYNC FETCH: changes in {calendar_id} since last run")
+        else:
+            print(f"🔄 SYNC FETCH: initial sync of {calendar_id} for the last {days_back} day(s)")
+        
+        start_date = datetime.now(timezone.utc) - timedelta(days=days_back)
+        meetings_data, cancelled_ids, next_sync_token = service.sync_calendar_data(calendar_id, sync_token, start_date)
+        
+        if not next_sync_token:
+            print("❌ Calendar sync failed")
+            return False
+        
+        print(f"✅ Found {len(meetings_data)} changed and {len(cancelled_ids)} cancelled events")
+        
+        if meetings_data and not store_meetings_data(meetings_data, clear_existing=False, operation="sync"):
+            return False
+        
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if cancelled_ids:
+                cursor.execute("DELETE FROM meetings WHERE event_id = ANY(%s)", (cancelled_ids,))
+                print(f"🗑️  Removed {cursor.rowcount} cancelled events")
+            cursor.execute("""
+                INSERT INTO calendar_sync_state (calendar_id, sync_token, updated_at)
+                VALUES (%s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (calendar_id) DO UPDATE SET
+                    sync_token = EXCLUDED.sync_token, updated_at = EXCLUDED.updated_at
+            """, (calendar_id, next_sync_token))
+            conn.commit()
+        
+        if cancelled_ids:
+            clear_meetings_cache()
+        
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error syncing calendar data: {e}")
+        return False
+
+# Columns written for every meeting record, in INSERT order
+MEETING_COLUMNS = (
+    'event_id', 'calendar_id', 'user_email', 'department', 'division', 'subdepartment',
+    'is_manager', 'start_time', 'end_time', 'duration_minutes', 'attendees_count',
+    'attendees_accepted', 'attendees_declined', 'attendees_tentative',
+    'attendees_needs_action', 'attendees_accepted_emails', 'summary', 'meet_link',
+    'html_link', 'is_one_on_one', 'has_manager_attendee', 'unique_departments',
+    'departments_list'
+)
+
+# Columns refreshed when an already stored event is fetched again
+MEETING_UPDATE_COLUMNS = (
+    'summary', 'start_time', 'end_time', 'duration_minutes', 'attendees_count',
+    'attendees_accepted', 'attendees_declined', 'attendees_tentative',
+    'attendees_needs_action', 'meet_link', 'html_link'
+)
+
+# Reads a MeetingRecord as an INSERT row tuple
+_meeting_row = attrgetter(*MEETING_COLUMNS)
+
+# Rows sent per multi-row INSERT statement
+BULK_INSERT_PAGE_SIZE = 1000
+
+def bulk_insert_meetings(cursor, meetings):
+    """Upsert MeetingRecords with multi-row INSERTs; returns (inserted, updated)"""
+    query = f"""
+        INSERT INTO meetings ({', '.join(MEETING_COLUMNS)}) VALUES %s
+        ON CONFLICT (event_id) DO UPDATE SET
+            {', '.join(f'{column} = EXCLUDED.{column}' for column in MEETING_UPDATE_COLUMNS)}
+        RETURNING (xmax = 0)
+    """
+    rows = execute_values(
+        cursor, query,
+        [_meeting_row(meeting) for meeting in meetings],
+        page_size=BULK_INSERT_PAGE_SIZE, fetch=True
+    )
+    inserted = sum(1 for (was_inserted,) in rows if was_inserted)
+    return inserted, len(rows) - inserted
+
 def store_meetings_data(meetings_data, clear_existing=False, operation="fetch"):
     """Store meetings data in database with duplicate handling"""
     try:
+        # Keep the last copy of each event; overlapping fetch windows return boundary
+        # events twice, and one upsert statement cannot touch the same row twice
+        meetings_by_id = {meeting.event_id: meeting for meeting in meetings_data}
+        skipped = len(meetings_data) - len(meetings_by_id)
+        
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
@@ -123,80 +258,12 @@ def store_meetings_data(meetings_data, clear_existing=False, operation="fetch"):
                 cursor.execute("DELETE FROM meetings")
                 print(f"🗑️  Cleared existing meetings data")
             
-            inserted = 0
-            updated = 0
-            skipped = 0
-            
-            print(f"💾 Processing {len(meetings_data)} events...")
+            print(f"💾 Processing {len(meetings_by_id)} events...")
             
-            for i, meeting in enumerate(meetings_data):
-                try:
-                    # Check if event already exists (for incremental updates)
-                    if not clear_existing:
-                        cursor.execute("SELECT id FROM meetings WHERE event_id = %s", (meeting['event_id'],))
-                        existing = cursor.fetchone()
-                        
-                        if existing:
-                            # Update existing event
-                            cursor.execute("""
-                                UPDATE meetings SET 
-                                    summary = %s, start_time = %s, end_time = %s, 
-                                    duration_minutes = %s, attendees_count = %s,
-                                    attendees_accepted = %s, attendees_declined = %s,
-                                    attendees_tentative = %s, attendees_needs_action = %s,
-                                    meet_link = %s, html_link = %s
-                                WHERE event_id = %s
-                            """, (
-                                meeting['summary'], meeting['start_time'], meeting['end_time'],
-                                meeting['duration_minutes'], meeting['attendees_count'],
-                                meeting['attendees_accepted'], meeting['attendees_declined'],
-                                meeting['attendees_tentative'], meeting['attendees_needs_action'],
-                                meeting['meet_link'], meeting['html_link'], meeting['event_id']
-                            ))
-                            updated += 1
-                            continue
-                    
-                    # Insert new event
-                    cursor.execute("""
-                        INSERT INTO meetings (
-                            event_id, calendar_id, user_email, department, division, subdepartment,
-                            is_manager, start_time, end_time, duration_minutes, attendees_count,
-                            attendees_accepted, attendees_declined, attendees_tentative, 
-                            attendees_needs_action, attendees_accepted_emails, summary, meet_link,
-                            html_link, is_one_on_one, has_manager_attendee, unique_departments,
-                            departments_list
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        ) ON CONFLICT (event_id) DO NOTHING
-                    """, (
-                        meeting['event_id'], meeting['calendar_id'], meeting['user_email'],
-                        meeting['department'], meeting['division'], meeting['subdepartment'],
-                        meeting['is_manager'], meeting['start_time'], meeting['end_time'],
-                        meeting['duration_minutes'], meeting['attendees_count'],
-                        meeting['attendees_accepted'], meeting['attendees_declined'],
-                        meeting['attendees_tentative'], meeting['attendees_needs_action'],
-                        meeting['attendees_accepted_emails'], meeting['summary'],
-                        meeting['meet_link'], meeting['html_link'], meeting['is_one_on_one'],
-                        meeting['has_manager_attendee'], meeting['unique_departments'],
-                        meeting['departments_list']
-                    ))
-                    
-                    if cursor.rowcount > 0:
-                        inserted += 1
-                    else:
-                        skipped += 1
-                    
-                    # Progress indicator for large datasets
-                    if (i + 1) % 100 == 0:
-                        print(f"   📝 Processed {i + 1}/{len(meetings_data)} events...")
-                        
-                except Exception as e:
-                    skipped += 1
-                    if skipped <= 5:
-                        logger.error(f"Error processing meeting {meeting.get('event_id', 'unknown')}: {e}")
-                    continue
+            inserted, updated = bulk_insert_meetings(cursor, meetings_by_id.values())
             
             conn.commit()
+            clear_meetings_cache()
             
             # Summary
             print(f"\n✅ {operation.upper()} COMPLETE:")
@@ -250,26 +317,28 @@ def main():
     parser.add_argument('--daily', action='store_true', help='Fetch only today\'s data (daily update)')
     parser.add_argument('--start-date', help='Start date (YYYY-MM-DD)')
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--sync', action='store_true', help='Fetch only events changed since the last sync')
     
     args = parser.parse_args()
     
     try:
-        fetcher = DynamicCalendarFetcher()
-        
-        if args.daily:
+        if args.sync:
+            print("🔄 Syncing changed events...")
+            success = fetch_sync_data(days_back=args.days or 30)
+        elif args.daily:
             print("📅 Performing daily update...")
-            success = fetcher.fetch_daily_update()
+            success = fetch_incremental_data(days_back=1)
         elif args.years:
             print(f"📚 Fetching {args.years} year(s) of historical data...")
-            success = fetcher.fetch_historical_data(years=args.years)
+            success = fetch_historical_data(years_back=args.years)
         elif args.days:
             print(f"📅 Fetching last {args.days} days...")
-            success = fetcher.fetch_recent_data(days=args.days)
+            success = fetch_incremental_data(days_back=args.days)
         elif args.start_date and args.end_date:
             print(f"📅 Fetching data from {args.start_date} to {args.end_date}...")
-            success = fetcher.fetch_date_range(args.start_date, args.end_date)
+            success = fetch_date_range(args.start_date, args.end_date)
         else:
-            print("❌ Please specify one of: --daily, --years, --days, or --start-date with --end-date")
+            print("❌ Please specify one of: --sync, --daily, --years, --days, or --start-date with --end-date")
             sys.exit(1)
         
         if success:
@@ -98,22 +98,22 @@ def init_database():
                 start_time TIMESTAMP NOT NULL,
                 end_time TIMESTAMP NOT NULL,
                 duration_minutes INTEGER,
-                attendees_count INTEGER DEFAULT 0,
-                attendees_accepted INTEGER DEFAULT 0,
-                attendees_declined INTEGER DEFAULT 0,
-                attendees_tentative INTEGER DEFAULT 0,
-                attendees_needs_action INTEGER DEFAULT 0,
-                attendees_accepted_emails TEXT,
+                attendees_count SMALLINT DEFAULT 0,
+                attendees_accepted SMALLINT DEFAULT 0,
+                attendees_declined SMALLINT DEFAULT 0,
+                attendees_tentative SMALLINT DEFAULT 0,
+                attendees_needs_action SMALLINT DEFAULT 0,
+                attendees_accepted_emails TEXT[],
                 summary TEXT,
                 meet_link TEXT,
                 html_link TEXT,
                 is_one_on_one BOOLEAN DEFAULT FALSE,
                 has_manager_attendee BOOLEAN DEFAULT FALSE,
-                unique_departments INTEGER DEFAULT 1,
+                unique_departments SMALLINT DEFAULT 1,
                 departments_list TEXT,
                 event_id TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+            ) WITH (fillfactor = 85)
         ''')
         
         # Create users table
@@ -133,9 +133,27 @@ def init_database():
         
         # Create indexes
         logger.info("Creating indexes...")
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_user_email ON meetings(user_email)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_meetings_user_time ON meetings(user_email, start_time DESC)
+            INCLUDE (duration_minutes, attendees_count, is_one_on_one)
+        ''')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_start_time ON meetings(start_time)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_department ON meetings(department)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_meetings_dept_time ON meetings(department, start_time DESC)
+            INCLUDE (duration_minutes)
+        ''')
+        # The GIN index needs the TEXT[] column; tables created before it stay TEXT until update_schema.py migrates them
+        cursor.execute("""
+            SELECT data_type 
+            FROM information_schema.columns 
+            WHERE table_name = 'meetings' 
+            AND column_name = 'attendees_accepted_emails'
+        """)
+        column = cursor.fetchone()
+        if column and column[0] == 'ARRAY':
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_accepted_emails_gin ON meetings USING GIN (attendees_accepted_emails)')
+        else:
+            logger.warning("attendees_accepted_emails is not an array column; run update_schema.py to migrate it and build its index")
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_event_id ON meetings(event_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
         
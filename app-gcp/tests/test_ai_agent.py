@@ -0,0 +1,28 @@
+"""
+Tests for the chat analysis helpers
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('psycopg2')
+pytest.importorskip('pyarrow')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ai_agent
+
+def test_bucket_counts_matches_pd_cut():
+    durations = pd.Series([29, 30, 60, 61, None], dtype='Int64')
+    
+    counts = ai_agent._bucket_counts(durations, ai_agent.DURATION_BINS, ai_agent.DURATION_LABELS)
+    
+    # The pd.cut call _bucket_counts replaced
+    expected = pd.cut(durations.astype(float), bins=ai_agent.DURATION_BINS,
+                      labels=ai_agent.DURATION_LABELS).value_counts()
+    assert counts.to_dict() == expected.to_dict()
+    assert counts.to_dict() == {'short': 1, 'medium': 2, 'long': 1}
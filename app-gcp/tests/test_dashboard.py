@@ -0,0 +1,35 @@
+"""
+Tests for the dashboard's chart helpers
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('psycopg2')
+pytest.importorskip('pyarrow')
+pytest.importorskip('plotly')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import dashboard
+
+@pytest.mark.parametrize('n, threshold', [(10, 3), (100, 10), (1000, 999), (5000, 3000)])
+def test_lttb_indices_returns_threshold_sorted_unique_points(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.random(n))
+    y = rng.random(n)
+    
+    selected = dashboard.lttb_indices(x, y, threshold)
+    
+    assert len(selected) == threshold
+    assert selected[0] == 0
+    assert selected[-1] == n - 1
+    assert np.all(np.diff(selected) > 0)
+
+def test_lttb_indices_keeps_everything_below_threshold():
+    x = np.arange(5, dtype=float)
+    assert dashboard.lttb_indices(x, x, 10).tolist() == [0, 1, 2, 3, 4]
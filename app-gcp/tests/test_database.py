@@ -0,0 +1,78 @@
+"""
+Tests for the COPY-based meetings reader and the derived meeting columns
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('psycopg2')
+pytest.importorskip('pyarrow')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database
+
+class FakeCursor:
+    """Cursor that answers copy_expert with a fixed CSV payload"""
+    
+    def __init__(self, payload):
+        self.payload = payload
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def mogrify(self, query, params):
+        return query.encode()
+    
+    def copy_expert(self, sql, buffer):
+        buffer.write(self.payload)
+
+class FakeConnection:
+    def __init__(self, payload):
+        self.payload = payload
+    
+    def cursor(self):
+        return FakeCursor(self.payload)
+
+def test_read_query_via_copy_keeps_multiline_summaries():
+    # Well over pyarrow's 1 MiB block size, so quoted newlines straddle block boundaries
+    rows = 60000
+    lines = ['summary,attendees_count']
+    lines.extend(f'"Weekly sync {i}\nagenda: ""status""",{i % 7}' for i in range(rows))
+    payload = ('\n'.join(lines) + '\n').encode()
+    assert len(payload) > 2 * 1024 * 1024
+    
+    df = database.read_query_via_copy(FakeConnection(payload), 'SELECT 1', {}, [])
+    
+    assert len(df) == rows
+    assert df['summary'].iloc[0] == 'Weekly sync 0\nagenda: "status"'
+    assert df['summary'].iloc[-1] == f'Weekly sync {rows - 1}\nagenda: "status"'
+    assert df['attendees_count'].sum() == sum(i % 7 for i in range(rows))
+
+def test_add_derived_columns_matches_pd_cut_buckets():
+    hours = [0, 9, 10, 12, 17, 18, 23]
+    df = pd.DataFrame({
+        'start': pd.to_datetime([f'2026-01-05 {hour:02d}:30' for hour in hours]),
+        'hour': hours,
+    })
+    
+    database.add_derived_columns(df)
+    
+    # The pd.cut call add_derived_columns replaced
+    expected = pd.cut(
+        df['hour'],
+        bins=[0, 9, 12, 17, 24],
+        labels=database.TIME_OF_DAY_LABELS,
+        include_lowest=True
+    )
+    assert df['time_of_day'].astype(str).tolist() == expected.astype(str).tolist()
+    assert df['month'].tolist() == df['start'].dt.month_name().tolist()
+    assert df['year'].tolist() == df['start'].dt.year.tolist()
+    assert df['date'].tolist() == df['start'].dt.date.tolist()
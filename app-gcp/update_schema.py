@@ -16,6 +16,16 @@ from database import get_db_connection
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Composite indexes matching the analytics filters; INCLUDE columns allow index-only scans
+QUERY_INDEXES = {
+    'idx_meetings_user_time': "meetings (user_email, start_time DESC) INCLUDE (duration_minutes, attendees_count, is_one_on_one)",
+    'idx_meetings_dept_time': "meetings (department, start_time DESC) INCLUDE (duration_minutes)",
+    'idx_meetings_accepted_emails_gin': "meetings USING GIN (attendees_accepted_emails)",
+}
+
+# Single-column indexes made redundant by the composite indexes
+REDUNDANT_INDEXES = ('idx_meetings_user_email', 'idx_meetings_department')
+
 def update_schema():
     """Add event_id column and unique constraint to prevent duplicates"""
     try:
@@ -66,10 +76,6 @@ def update_schema():
             print("🔧 Creating index on start_time...")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_meetings_start_time ON meetings (start_time)")
             
-            # Create index on user_email
-            print("🔧 Creating index on user_email...")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_meetings_user_email ON meetings (user_email)")
-            
             conn.commit()
             print("✅ Schema update completed successfully")
             
@@ -92,6 +98,61 @@ def update_schema():
         logger.error(f"Error updating schema: {e}")
         return False
 
+def migrate_accepted_emails_array():
+    """Convert the comma-separated attendees_accepted_emails column to TEXT[]"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT data_type 
+                FROM information_schema.columns 
+                WHERE table_name = 'meetings' 
+                AND column_name = 'attendees_accepted_emails'
+            """)
+            column = cursor.fetchone()
+            
+            if not column or column[0] == 'ARRAY':
+                print("✅ attendees_accepted_emails is already an array column")
+                return True
+            
+            print("🔧 Converting attendees_accepted_emails to TEXT[]...")
+            cursor.execute("""
+                ALTER TABLE meetings 
+                ALTER COLUMN attendees_accepted_emails TYPE TEXT[] 
+                USING string_to_array(NULLIF(attendees_accepted_emails, ''), ',')
+            """)
+            conn.commit()
+            print("✅ attendees_accepted_emails converted")
+            return True
+            
+    except Exception as e:
+        logger.error(f"Error converting attendees_accepted_emails: {e}")
+        return False
+
+def create_query_indexes():
+    """Build the composite query indexes without blocking writes to meetings"""
+    try:
+        with get_db_connection() as conn:
+            # CONCURRENTLY cannot run inside a transaction block
+            conn.commit()
+            conn.autocommit = True
+            cursor = conn.cursor()
+            
+            for index_name, index_def in QUERY_INDEXES.items():
+                print(f"🔧 Creating index {index_name}...")
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {index_def}")
+            
+            for index_name in REDUNDANT_INDEXES:
+                print(f"🗑️  Dropping redundant index {index_name}...")
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+            
+            return True
+            
+    except Exception as e:
+        logger.error(f"Error creating query indexes: {e}")
+        return False
+
 if __name__ == '__main__':
     print("🚀 Updating database schema...")
     
@@ -104,7 +165,7 @@ if __name__ == '__main__':
         print("Please ensure all database connection environment variables are set.")
         sys.exit(1)
     
-    success = update_schema()
+    success = update_schema() and migrate_accepted_emails_array() and create_query_indexes()
     
     if success:
         print("✅ Schema update completed!")